@@ -1,25 +1,57 @@
 import csv
+import itertools
 import logging
 
+import utils
 
-__all__ = ['AnswersParser']
 
+__all__ = ['AnswersParser', 'AnswersFile']
 
-class AnswersParser:
-    def __init__(self, answers):
-        self.answers = []
-        self._parse(answers)
-
-    def _parse(self, answers):
-        reader = csv.reader(answers, delimiter=';')
-        for (i, item) in enumerate(reader):
-            if len(item) < 10:
+
+def parse_answers(lines, warn=True):
+    reader = csv.reader(lines, delimiter=';')
+    for (i, item) in enumerate(reader):
+        if len(item) < 10:
+            if warn:
                 logging.warning('Invalid line %d in student answers file', i)
-                continue
-
-            (_, _, problemid, taskid, userid, _,
-             time, correct, *_, question, _) = item
-            if question == 'NULL':
-                question = ''
-            self.answers.append(
-                (problemid, taskid, question, userid, time, correct))
+            continue
+
+        (_, courseid, problemid, taskid, userid, _,
+         time, correct, *_, question, _) = item
+        if question == 'NULL':
+            question = ''
+        yield ((problemid, taskid, question, userid, time, correct),
+               courseid.split(':', 1)[-1])
+
+
+class AnswersFile:
+    def __init__(self, filename, encoding):
+        self.filename = filename
+        self.encoding = encoding
+        open(filename, encoding=encoding).close()
+
+    def __iter__(self):
+        with open(self.filename, encoding=self.encoding) as file:
+            yield from file
+
+
+class AnswersParser:
+    def __init__(self, answers, course_id=None):
+        if iter(answers) is answers:
+            answers = list(answers)
+        self.source = answers
+        self.course_id = course_id
+        self._passes = itertools.count()
+
+    @property
+    def answers(self):
+        warn = next(self._passes) == 0
+        for (answer, course_id) in parse_answers(self.source, warn):
+            if self.course_id is None or self.course_id in (
+                    course_id, utils.get_course_key(answer[0])):
+                yield answer
+
+    def select(self, course_id):
+        parser = AnswersParser(self.source, course_id)
+        parser._passes = self._passes
+        return parser
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+
+import argparse
+import collections
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+
+import csv5
+import decoder
+from benchmarks import synthetic
+
+
+GENERATOR_PARAMS = [
+    'events', 'users', 'problems', 'videos', 'modules', 'courses', 'answers',
+    'noise', 'seed']
+
+
+def get_generator_params(params):
+    data = collections.OrderedDict(
+        (name, getattr(params, name)) for name in GENERATOR_PARAMS)
+    data['mix'] = synthetic.parse_mix(params.mix)
+    return data
+
+
+def prepare(directory, params):
+    filename = os.path.join(directory, 'params.json')
+    generator_params = get_generator_params(params)
+    if os.path.exists(filename):
+        with open(filename) as file:
+            if json.load(file) == json.loads(json.dumps(generator_params)):
+                return
+    synthetic.generate(directory, params)
+    with open(filename, 'w') as file:
+        json.dump(generator_params, file, indent=2)
+
+
+def convert(params):
+    import converter
+
+    paths = {name: os.path.join(params.data, filename)
+             for (name, filename) in synthetic.FILES.items()}
+    with tempfile.TemporaryDirectory() as output:
+        stats = converter.convert(
+            paths['course'], paths['answers'], paths['courses'],
+            paths['log'], 'utf8', os.path.join(output, 'csv'),
+            workers=params.workers, backend=params.format,
+            multi_course=params.courses > 1,
+            json_decoder=params.json_decoder, use_mmap=params.use_mmap,
+            stats=True, pipeline=params.pipeline)
+    json.dump(stats, sys.stdout)
+
+
+def run(directory):
+    process = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.convert'] + sys.argv[1:] +
+        ['--data', directory, '--run'],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True)
+    if process.returncode:
+        raise RuntimeError(process.stderr)
+    return json.loads(
+        process.stdout, object_pairs_hook=collections.OrderedDict)
+
+
+def add_throughput(stats, size):
+    (parse, total) = (stats['stages']['parse']['wall'],
+                      stats['stages']['total']['wall'])
+    stats['throughput'] = collections.OrderedDict([
+        ('parse_mb_per_second', size / parse / 1e6),
+        ('total_mb_per_second', size / total / 1e6),
+        ('lines_per_second', stats['lines'] / parse),
+    ])
+    return stats
+
+
+def get_best(runs):
+    return collections.OrderedDict(
+        (name, min(stats['stages'][name]['wall'] for stats in runs))
+        for name in runs[0]['stages'])
+
+
+def benchmark(directory, params):
+    prepare(directory, params)
+    size = os.path.getsize(os.path.join(directory, synthetic.FILES['log']))
+    runs = [add_throughput(run(directory), size)
+            for _ in range(params.repeat)]
+    best = get_best(runs)
+
+    for (name, seconds) in best.items():
+        print('{:<24} {:8.3f}s'.format(name, seconds), file=sys.stderr)
+    print('{:<24} {:8.1f} MB/s, {:.0f} lines/s'.format(
+        'parse throughput', size / best['parse'] / 1e6,
+        runs[0]['lines'] / best['parse']), file=sys.stderr)
+    peaks = [stats['peak_memory']['self']
+             for stats in runs if stats['peak_memory']]
+    if peaks:
+        print('{:<24} {:8.1f} MB'.format('peak memory', max(peaks) / 1e6),
+              file=sys.stderr)
+
+    return collections.OrderedDict([
+        ('generator', get_generator_params(params)),
+        ('options', collections.OrderedDict(
+            (name, getattr(params, name))
+            for name in ('workers', 'pipeline', 'json_decoder', 'use_mmap',
+                         'format'))),
+        ('environment', collections.OrderedDict([
+            ('python', platform.python_version()),
+            ('platform', platform.platform()),
+            ('cpus', os.cpu_count()),
+        ])),
+        ('log_size', size),
+        ('runs', runs),
+        ('best', best),
+    ])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Time the stages of converter.convert on a synthetic '
+                    'tracking log and write the results as JSON')
+    synthetic.add_arguments(parser)
+    parser.add_argument('-r', '--repeat', type=int, default=3)
+    parser.add_argument('-w', '--workers', type=int, default=1)
+    parser.add_argument('-p', '--pipeline', action='store_true')
+    parser.add_argument(
+        '-j', '--json-decoder', type=str, default='auto',
+        choices=['auto'] + decoder.DECODERS)
+    parser.add_argument('--no-mmap', dest='use_mmap', action='store_false')
+    parser.add_argument(
+        '-f', '--format', type=str, choices=csv5.BACKENDS, default='csv')
+    parser.add_argument(
+        '--data', type=str, metavar='DIR',
+        help='Keep the generated files in DIR and reuse them while the '
+             'generator parameters stay the same')
+    parser.add_argument(
+        '-o', '--output', type=str, default='-', metavar='FILE',
+        help='Results file ("-" for stdout)')
+    parser.add_argument('--run', action='store_true', help=argparse.SUPPRESS)
+    params = parser.parse_args()
+
+    if params.run:
+        convert(params)
+        return
+
+    if params.data:
+        results = benchmark(params.data, params)
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            results = benchmark(directory, params)
+
+    if params.output == '-':
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    else:
+        with open(params.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
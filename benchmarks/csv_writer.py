@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import csv5
+
+
+def make_rows(count, users=10000, problems=500, seed=0):
+    rnd = random.Random(seed)
+    return [
+        ('user{}'.format(rnd.randrange(users)),
+         'block-v1:a+b+c+type@problem+block@{:032x}'.format(
+             rnd.randrange(problems)),
+         rnd.randrange(2),
+         '01.01.2018 12:{:02}:{:02}'.format(
+             rnd.randrange(60), rnd.randrange(60)))
+        for _ in range(count)]
+
+
+def write_rows(processor, rows):
+    for row in rows:
+        processor.write(*row)
+
+
+def write_batched(processor, rows):
+    processor.writeiter(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', '--rows', type=int, default=500000)
+    parser.add_argument('-r', '--repeat', type=int, default=3)
+    params = parser.parse_args()
+
+    rows = make_rows(params.rows)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        prefix = os.path.join(tmpdir, 'csv')
+        for (name, write) in (('per-row', write_rows),
+                              ('batched', write_batched)):
+            best = float('inf')
+            for _ in range(params.repeat):
+                start = time.perf_counter()
+                with csv5.CSV1(prefix, 'utf8') as processor:
+                    write(processor, rows)
+                best = min(best, time.perf_counter() - start)
+            print('{:<10} {:10.0f} rows/s'.format(name, params.rows / best))
+
+
+if __name__ == '__main__':
+    main()
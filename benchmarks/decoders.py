@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+
+import argparse
+import itertools
+import json
+import random
+import re
+import timeit
+
+import decoder
+
+
+BLOCK = 'block-v1:Org+Course101+2018_T1+type@{}+block@{:032x}'
+CONTEXT = {
+    'course_id': 'course-v1:Org+Course101+2018_T1',
+    'org_id': 'Org',
+    'path': '/event',
+    'module': {'display_name': 'Problem', 'usage_key': BLOCK.format(
+        'problem', 1)},
+}
+
+
+def make_entry(rnd, i):
+    context = dict(CONTEXT, user_id=rnd.randrange(100000))
+    entry = {
+        'username': 'user{}'.format(context['user_id']),
+        'session': '{:032x}'.format(rnd.getrandbits(128)),
+        'ip': '10.0.{}.{}'.format(rnd.randrange(256), rnd.randrange(256)),
+        'agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36',
+        'host': 'courses.example.org',
+        'time': '2018-01-01T12:00:{:02}.{:06}+00:00'.format(i % 60, i),
+        'context': context,
+        'event_source': 'browser',
+        'page': 'https://courses.example.org/courses/x/courseware/m1/s1/',
+    }
+    kind = rnd.random()
+    if kind < 0.5:
+        entry.update(event_type='page_close', event='')
+    elif kind < 0.8:
+        entry.update(event_type='play_video', event=json.dumps({
+            'id': '{:032x}'.format(rnd.randrange(1000)),
+            'currentTime': rnd.random() * 600, 'code': 'html5'}))
+    else:
+        problem = rnd.randrange(1000)
+        entry.update(event_type='problem_check', event_source='server', event={
+            'problem_id': BLOCK.format('problem', problem),
+            'submission': {
+                '{:032x}_{}_1'.format(problem, k): {
+                    'question': 'Question {}'.format(k),
+                    'answer': 'Answer',
+                    'response_type': 'choiceresponse',
+                    'correct': rnd.random() < 0.5,
+                    'input_type': 'checkboxgroup',
+                    'variant': ''}
+                for k in range(2, 4)},
+            'grade': 1, 'max_grade': 2, 'attempts': 1})
+    return json.dumps(entry)
+
+
+def make_sample(count, seed=0):
+    rnd = random.Random(seed)
+    return [make_entry(rnd, i) for i in range(count)]
+
+
+def read_sample(filename, count):
+    with open(filename, encoding='utf8') as file:
+        return [re.findall(r'.*?({.*})', line)[-1]
+                for line in itertools.islice(file, count) if '{' in line]
+
+
+def decode(loads, sample):
+    for line in sample:
+        item = loads(line)
+        event = item.get('event')
+        if isinstance(event, str) and event.startswith('{'):
+            loads(event)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', '--events', type=int, default=100000)
+    parser.add_argument('-r', '--repeat', type=int, default=5)
+    parser.add_argument(
+        '--log', type=str, help='Take the sample from a log file instead')
+    params = parser.parse_args()
+
+    if params.log:
+        sample = read_sample(params.log, params.events)
+    else:
+        sample = make_sample(params.events)
+    size = sum(map(len, sample))
+
+    for name in decoder.DECODERS:
+        try:
+            loads = decoder.get_decoder(name)
+        except RuntimeError:
+            print('{:<10} not installed'.format(name))
+            continue
+        best = min(timeit.repeat(
+            lambda: decode(loads, sample), number=1, repeat=params.repeat))
+        print('{:<10} {:10.0f} entries/s {:8.1f} MB/s'.format(
+            name, len(sample) / best, size / best / 1e6))
+
+
+if __name__ == '__main__':
+    main()
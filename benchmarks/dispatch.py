@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+import argparse
+import random
+import timeit
+
+from logs import LogParser
+from utils import Registry
+
+
+EVENT_MIX = [
+    ({'event_type': 'page_close'}, 30),
+    ({'event_type': '/courses/course-v1:a+b/courseware'}, 30),
+    ({'event_type': 'problem_check', 'event_source': 'browser'}, 5),
+    ({'event_type': 'problem_check', 'event_source': 'server'}, 5),
+    ({'event_type': 'edx.grades.problem.submitted'}, 5),
+    ({'event_type': 'play_video'}, 15),
+    ({'event_type': 'load_video'}, 5),
+    ({'event_type': 'openassessmentblock.peer_assess'}, 5),
+]
+
+
+def linear_dispatch(registry, obj, item):
+    for (kwargs, func) in registry.handlers:
+        if Registry.check_item(item, kwargs):
+            return func(obj, item)
+    return registry.default(obj, item)
+
+
+def make_registry():
+    registry = Registry()
+    for (kwargs, _) in LogParser.handler.handlers:
+        registry.add(**kwargs)(lambda obj, item: None)
+    return registry
+
+
+def make_events(count, seed=0):
+    rnd = random.Random(seed)
+    (events, weights) = zip(*EVENT_MIX)
+    return rnd.choices(events, weights, k=count)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', '--events', type=int, default=100000)
+    parser.add_argument('-r', '--repeat', type=int, default=5)
+    params = parser.parse_args()
+
+    registry = make_registry()
+    events = make_events(params.events)
+
+    def linear():
+        for item in events:
+            linear_dispatch(registry, None, item)
+
+    def compiled():
+        for item in events:
+            registry(None, item)
+
+    for (name, func) in (('linear', linear), ('compiled', compiled)):
+        best = min(timeit.repeat(func, number=1, repeat=params.repeat))
+        print('{:<10} {:8.1f} ns/event'.format(
+            name, best / params.events * 1e9))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+
+import argparse
+import timeit
+
+from utils import compile_items, get_items
+
+
+ITEMS = ['context.user_id', 'event.problem_id', 'referer', 'time']
+
+EVENT = {
+    'event_type': 'edx.grades.problem.submitted',
+    'referer': 'https://courses.local/courses/course-v1:a+b+c/courseware/m1/',
+    'time': '2018-01-02T09:30:00.000000+00:00',
+    'context': {'user_id': 15, 'course_id': 'course-v1:a+b+c'},
+    'event': {'problem_id': 'block-v1:a+b+c+type@problem+block@p1'},
+}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', '--events', type=int, default=100000)
+    parser.add_argument('-r', '--repeat', type=int, default=5)
+    params = parser.parse_args()
+
+    getter = compile_items(ITEMS)
+    assert getter(EVENT) == get_items(EVENT, ITEMS)
+
+    for (name, func) in (('get_items', lambda: get_items(EVENT, ITEMS)),
+                         ('compiled', lambda: getter(EVENT))):
+        best = min(timeit.repeat(
+            func, number=params.events, repeat=params.repeat))
+        print('{:<10} {:8.1f} ns/event'.format(
+            name, best / params.events * 1e9))
+
+
+if __name__ == '__main__':
+    main()
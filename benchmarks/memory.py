@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+
+import argparse
+import collections
+import random
+import resource
+import subprocess
+import sys
+import time
+
+import models
+
+
+BLOCK = 'block-v1:Org+Course101+2018_T1+type@{}+block@{:032x}'
+
+
+class StringUsers:
+    def __init__(self):
+        self.times = collections.defaultdict(
+            lambda: collections.defaultdict(list))
+        self.submits = collections.defaultdict(
+            lambda: collections.defaultdict(list))
+        self.viewed_content = collections.defaultdict(set)
+
+    def post_solution(self, user_id, problem_id, time):
+        self.times[user_id][problem_id].append(time)
+
+    def score_task(self, user_id, problem_id, subtask_id, correct, time=None):
+        time = (self.times[user_id][problem_id] or [time])[-1]
+        self.submits[user_id][subtask_id].append((time, int(correct)))
+
+    def view_content(self, user_id, content_id):
+        self.viewed_content[user_id].add(content_id)
+
+
+VARIANTS = {
+    'strings': StringUsers,
+    'interned': models.Users,
+}
+
+
+def apply_events(users, count, params, seed=0):
+    rnd = random.Random(seed)
+    for i in range(count):
+        user_id = str(rnd.randrange(params.users))
+        if rnd.random() < 0.5:
+            video = rnd.randrange(params.videos)
+            users.view_content(user_id, BLOCK.format('video', video))
+        else:
+            problem = rnd.randrange(params.problems)
+            problem_id = BLOCK.format('problem', problem)
+            time = '{:02}.01.2018 12:00:00'.format(i % 28 + 1)
+            users.post_solution(user_id, problem_id, time)
+            for subtask in range(2):
+                users.score_task(
+                    user_id, problem_id,
+                    '{:032x}_{}_1'.format(problem, subtask),
+                    rnd.random() < 0.5)
+
+
+def run(params):
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    users = VARIANTS[params.run]()
+    apply_events(users, params.events, params)
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print('{:<10} peak RSS {:8.1f} MB (+{:.1f} MB), {:6.1f}s'.format(
+        params.run, peak / 1024, (peak - before) / 1024, elapsed))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', '--events', type=int, default=10000000)
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--problems', type=int, default=2000)
+    parser.add_argument('--videos', type=int, default=1000)
+    parser.add_argument('--run', choices=VARIANTS, help=argparse.SUPPRESS)
+    params = parser.parse_args()
+
+    if params.run:
+        run(params)
+        return
+
+    for variant in VARIANTS:
+        subprocess.check_call(
+            [sys.executable, '-m', 'benchmarks.memory', '--run', variant] +
+            sys.argv[1:])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+
+import argparse
+import collections
+import json
+import os
+import random
+from datetime import datetime, timedelta
+
+
+COURSE = 'Org+Bench{}+2018_T1'
+BLOCK = 'block-v1:{}+type@{}+block@{:032x}'
+CHAPTER = 'block-v1:{}+type@chapter+block@{}'
+PAGE = 'https://courses.example.org/courses/course-v1:{}/courseware/{}/s1/'
+START = datetime(2018, 1, 1)
+
+EVENT_MIX = collections.OrderedDict([
+    ('play_video', 20),
+    ('load_video', 8),
+    ('problem', 12),
+    ('create_submission', 1),
+    ('peer_assess', 2),
+    ('page_close', 25),
+    ('courseware', 24),
+])
+
+FILES = collections.OrderedDict([
+    ('log', 'tracking.log'),
+    ('course', 'course'),
+    ('answers', 'answers'),
+    ('courses', 'course_names'),
+])
+
+
+def get_module(course, index):
+    return '{:032x}'.format(course << 64 | index)
+
+
+class Course:
+    def __init__(self, index, params):
+        self.key = COURSE.format(index)
+        self.modules = [get_module(index, i) for i in range(params.modules)]
+        self.problems = range(params.problems)
+        self.videos = range(params.videos)
+        self.assessments = range(max(1, params.problems // 10))
+
+    def block(self, type_, index):
+        return BLOCK.format(self.key, type_, index)
+
+    def page(self, index):
+        return PAGE.format(self.key, self.modules[index % len(self.modules)])
+
+    def subtasks(self, problem):
+        return ['{:032x}_{}_1'.format(problem, k)
+                for k in range(2, 3 + problem % 3)]
+
+    def structure(self):
+        for (i, module) in enumerate(self.modules):
+            content = [
+                self.block(type_, index)
+                for (type_, items) in (('problem', self.problems),
+                                       ('video', self.videos),
+                                       ('openassessment', self.assessments))
+                for index in items[i::len(self.modules)]]
+            yield ';'.join([CHAPTER.format(self.key, module)] + content +
+                           ['Module {}'.format(i + 1)])
+
+
+class LogGenerator:
+    def __init__(self, params):
+        self.rnd = random.Random(params.seed)
+        self.params = params
+        self.courses = [Course(i + 1, params) for i in range(params.courses)]
+        (self.kinds, self.weights) = zip(*parse_mix(params.mix).items())
+        self.submissions = []
+        self.pending = None
+        self.time = START
+
+    def entry(self, i):
+        rnd = self.rnd
+        self.time += timedelta(microseconds=rnd.randrange(1, 2000000))
+        course = rnd.choice(self.courses)
+        user = rnd.randrange(self.params.users)
+        entry = collections.OrderedDict([
+            ('username', 'user{}'.format(user)),
+            ('session', '{:032x}'.format(rnd.getrandbits(128))),
+            ('ip', '10.0.{}.{}'.format(user >> 8 & 255, user & 255)),
+            ('agent', 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36'),
+            ('host', 'courses.example.org'),
+            ('event_source', 'browser'),
+            ('time', self.time.isoformat(timespec='microseconds') +
+             '+00:00'),
+            ('context', collections.OrderedDict([
+                ('course_id', 'course-v1:' + course.key),
+                ('org_id', 'Org'),
+                ('user_id', user),
+                ('path', '/event'),
+            ])),
+        ])
+        kind = rnd.choices(self.kinds, self.weights)[0]
+        getattr(self, '_' + kind)(entry, course, i)
+        return entry
+
+    def _play_video(self, entry, course, i, event_type='play_video'):
+        video = self.rnd.choice(course.videos)
+        entry.update(
+            event_type=event_type, page=course.page(video),
+            event=json.dumps({
+                'id': '{:032x}'.format(video),
+                'currentTime': round(self.rnd.random() * 600, 3),
+                'code': 'html5'}))
+
+    def _load_video(self, entry, course, i):
+        self._play_video(entry, course, i, 'load_video')
+
+    def _problem(self, entry, course, i):
+        problem = self.rnd.choice(course.problems)
+        check = collections.OrderedDict(entry)
+        entry.update(
+            event_type='edx.grades.problem.submitted',
+            event_source='server', referer=course.page(problem),
+            event={'problem_id': course.block('problem', problem),
+                   'weighted_earned': 1, 'weighted_possible': 2})
+        check.update(
+            event_type='problem_check', event_source='server',
+            event={
+                'problem_id': course.block('problem', problem),
+                'submission': {
+                    subtask: {
+                        'question': 'Question {}'.format(subtask[-3]),
+                        'answer': 'Answer',
+                        'response_type': 'choiceresponse',
+                        'input_type': 'checkboxgroup',
+                        'correct': self.rnd.random() < 0.5,
+                        'variant': ''}
+                    for subtask in course.subtasks(problem)},
+                'grade': 1, 'max_grade': 2, 'attempts': 1})
+        self.pending = check
+
+    def _create_submission(self, entry, course, i):
+        assessment = self.rnd.choice(course.assessments)
+        submission = '{:032x}'.format(self.rnd.getrandbits(128))
+        self.submissions.append(submission)
+        entry['context']['module'] = {
+            'usage_key': course.block('openassessment', assessment),
+            'display_name': 'Assessment {}'.format(assessment)}
+        entry.update(
+            event_type='openassessmentblock.create_submission',
+            event_source='server', referer=course.page(assessment),
+            event={'submission_uuid': submission,
+                   'answer': {'parts': [{'text': 'Essay'}]}})
+
+    def _peer_assess(self, entry, course, i):
+        if not self.submissions:
+            return self._create_submission(entry, course, i)
+        entry.update(
+            event_type='openassessmentblock.peer_assess',
+            event_source='server',
+            event={
+                'submission_uuid': self.rnd.choice(self.submissions),
+                'parts': [
+                    {'option': {'points': self.rnd.randrange(4)},
+                     'criterion': {'points_possible': 3}}
+                    for _ in range(2)]})
+
+    def _page_close(self, entry, course, i):
+        entry.update(event_type='page_close', event='')
+
+    def _courseware(self, entry, course, i):
+        url = course.page(i)[len('https://courses.example.org'):]
+        entry.update(
+            event_type=url, event_source='server',
+            event=json.dumps({'POST': {}, 'GET': {}}))
+
+    def noise(self, i):
+        line = json.dumps(self.entry(i))
+        self.pending = None
+        if self.rnd.random() < 0.5:
+            return line[:self.rnd.randrange(len(line))]
+        return 'Traceback (most recent call last): line {}'.format(i)
+
+    def lines(self):
+        for i in range(self.params.events):
+            if self.pending is not None:
+                (entry, self.pending) = (self.pending, None)
+                yield json.dumps(entry)
+            elif self.rnd.random() < self.params.noise:
+                yield self.noise(i)
+            else:
+                yield json.dumps(self.entry(i))
+
+    def answers(self):
+        rnd = random.Random(self.params.seed + 1)
+        for i in range(self.params.answers):
+            course = rnd.choice(self.courses)
+            problem = rnd.choice(course.problems)
+            subtask = rnd.choice(course.subtasks(problem))
+            user = rnd.randrange(self.params.users)
+            time = (START + timedelta(seconds=rnd.randrange(86400 * 30))
+                    ).isoformat()
+            question = ('NULL' if rnd.random() < 0.1 else
+                        'Question {}'.format(subtask[-3]))
+            yield ';'.join(map(str, (
+                i + 1, 'course-v1:' + course.key,
+                course.block('problem', problem), subtask, user,
+                'user{}'.format(user), time, int(rnd.random() < 0.5),
+                'Answer', 1, question, time)))
+
+
+def parse_mix(mix):
+    weights = collections.OrderedDict(EVENT_MIX)
+    for item in mix or ():
+        (kind, _, weight) = item.partition('=')
+        if kind not in weights:
+            raise ValueError('Unknown event kind: {}'.format(kind))
+        weights[kind] = float(weight)
+    if not any(weights.values()):
+        raise ValueError('Event mix is empty')
+    return weights
+
+
+def write_lines(filename, lines):
+    with open(filename, 'w', encoding='utf8') as file:
+        for line in lines:
+            file.write(line + '\n')
+
+
+def generate(directory, params):
+    os.makedirs(directory, exist_ok=True)
+    paths = collections.OrderedDict(
+        (name, os.path.join(directory, filename))
+        for (name, filename) in FILES.items())
+    generator = LogGenerator(params)
+    write_lines(paths['log'], generator.lines())
+    write_lines(paths['course'], (
+        line for course in generator.courses for line in course.structure()))
+    write_lines(paths['answers'], generator.answers())
+    write_lines(paths['courses'], (
+        '{};Benchmark course {};roo-{}'.format(course.key, i + 1, i + 1)
+        for (i, course) in enumerate(generator.courses)))
+    return paths
+
+
+def add_arguments(parser):
+    parser.add_argument(
+        '-n', '--events', type=int, default=200000,
+        help='Number of log lines')
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--problems', type=int, default=200)
+    parser.add_argument('--videos', type=int, default=100)
+    parser.add_argument('--modules', type=int, default=10)
+    parser.add_argument('--courses', type=int, default=1)
+    parser.add_argument(
+        '--answers', type=int, default=20000,
+        help='Number of lines in the student answers file')
+    parser.add_argument(
+        '--mix', type=str, action='append', metavar='KIND=WEIGHT',
+        help='Change the weight of an event kind ({}; a problem is an '
+             'edx.grades.problem.submitted and problem_check pair). May be '
+             'given several times'.format(', '.join(
+                 '{}={}'.format(*item) for item in EVENT_MIX.items())))
+    parser.add_argument(
+        '--noise', type=float, default=0.01,
+        help='Share of truncated and non-JSON log lines')
+    parser.add_argument('--seed', type=int, default=0)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Generate a synthetic tracking log with matching course '
+                    'structure, student answers and course names files')
+    add_arguments(parser)
+    parser.add_argument('directory', type=str)
+    params = parser.parse_args()
+
+    for (name, path) in generate(params.directory, params).items():
+        print('{:<10} {:8.1f} MB  {}'.format(
+            name, os.path.getsize(path) / 1e6, path))
+
+
+if __name__ == '__main__':
+    main()
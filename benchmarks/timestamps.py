@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+
+import argparse
+import random
+import timeit
+from datetime import datetime, timedelta
+
+import utils
+
+
+def strptime_datetime(timestr):
+    return datetime.strptime(
+        timestr.split('.')[0].split('+')[0],
+        '%Y-%m-%dT%H:%M:%S').strftime('%d.%m.%Y %H:%M:%S')
+
+
+def make_timestamps(count, rate, seed=0):
+    rnd = random.Random(seed)
+    time = datetime(2018, 1, 1)
+    timestamps = []
+    for _ in range(count):
+        time += timedelta(seconds=rnd.expovariate(rate))
+        timestamps.append(time.isoformat(timespec='microseconds') + '+00:00')
+    return timestamps
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-n', '--events', type=int, default=100000)
+    parser.add_argument('-r', '--repeat', type=int, default=5)
+    parser.add_argument(
+        '--rate', type=float, default=10, help='Events per second')
+    params = parser.parse_args()
+
+    timestamps = make_timestamps(params.events, params.rate)
+    assert list(map(utils.convert_datetime, timestamps)) == list(
+        map(strptime_datetime, timestamps))
+
+    def cold(func):
+        def run():
+            utils._convert_iso_datetime.cache_clear()
+            for timestr in timestamps:
+                func(timestr)
+        return run
+
+    for (name, func) in (('strptime', strptime_datetime),
+                         ('fast', utils.convert_datetime)):
+        best = min(timeit.repeat(cold(func), number=1, repeat=params.repeat))
+        print('{:<10} {:10.0f} timestamps/s'.format(
+            name, params.events / best))
+
+
+if __name__ == '__main__':
+    main()
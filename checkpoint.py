@@ -0,0 +1,45 @@
+import gzip
+import os
+import pickle
+
+
+__all__ = ['Checkpoint']
+
+
+class Checkpoint:
+    VERSION = 4
+    STATE = ('course_name', 'lines', 'lines_decoded', 'lines_skipped',
+             'users', 'tasks', 'modules', 'content')
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.offsets = {}
+        self.state = None
+        if os.path.exists(filename):
+            self._load()
+
+    def _load(self):
+        with gzip.open(self.filename, 'rb') as file:
+            data = pickle.load(file)
+        if data.get('version') != self.VERSION:
+            raise ValueError(
+                'Unsupported checkpoint version in {}'.format(self.filename))
+        self.offsets = data['offsets']
+        self.state = data['state']
+
+    def restore(self, parser):
+        for (name, value) in (self.state or {}).items():
+            setattr(parser, name, value)
+
+    def save(self, parser, log):
+        self.offsets = dict(self.offsets, **log.sizes)
+        self.state = {name: getattr(parser, name) for name in self.STATE}
+        data = {
+            'version': self.VERSION,
+            'offsets': self.offsets,
+            'state': self.state
+        }
+        tmpname = self.filename + '.tmp'
+        with gzip.open(tmpname, 'wb', compresslevel=1) as file:
+            pickle.dump(data, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmpname, self.filename)
@@ -1,25 +1,115 @@
+import collections
+import os
+import re
+
 from course import CourseParser, CoursesParser
-from answers import AnswersParser
-from logs import LogParser
-from csv5 import process_all_csvs
+from answers import AnswersFile, AnswersParser
+from logs import LogParser, MultiCourseParser
+from csv5 import process_all
+from reader import BUFFER_SIZE, LogFiles
+from stats import Stats, measure, profiling
 
 
 def convert(course_file, answers_file, courses_file, logs_file,
-            encoding, output):
+            encoding, output, workers=1, buffer_size=BUFFER_SIZE,
+            sort_logs=True, checkpoint=None, sparse=False, backend='csv',
+            spill=None, multi_course=False, json_decoder='auto',
+            use_mmap=True, stats=False, profile=None, pipeline=False):
+    stats = Stats() if stats else None
+    with profiling(profile), measure(stats, 'total'):
+        _convert(
+            course_file, answers_file, courses_file, logs_file, encoding,
+            output, workers, buffer_size, sort_logs, checkpoint, sparse,
+            backend, spill, multi_course, json_decoder, use_mmap, stats,
+            pipeline)
+    return None if stats is None else stats.as_dict()
+
+
+def get_course_directories(course_names):
+    directories = collections.OrderedDict()
+    courses = {}
+    for course_name in course_names:
+        directory = re.sub(r'[^\w.+-]', '_', course_name)
+        if not directory.strip('.'):
+            directory = '_' * max(len(directory), 1)
+        if directory in courses:
+            raise ValueError(
+                'Courses "{}" and "{}" map to the same output directory '
+                '{}'.format(courses[directory], course_name, directory))
+        courses[directory] = course_name
+        directories[course_name] = directory
+    return directories
+
+
+def write(output, encoding, parser, backend, sparse, workers, stats):
+    with measure(stats, 'write'):
+        timings = process_all(
+            output, encoding, parser, backend, sparse, workers)
+    if stats is not None:
+        for (filename, seconds) in timings.items():
+            stats.add('write.' + os.path.basename(filename), seconds)
+
+
+def _convert(course_file, answers_file, courses_file, logs_file, encoding,
+             output, workers, buffer_size, sort_logs, checkpoint, sparse,
+             backend, spill, multi_course, json_decoder, use_mmap, stats,
+             pipeline):
     optional_data_source = [
         (course_file, CourseParser),
         (answers_file, AnswersParser),
         (courses_file, CoursesParser)]
 
     optional_source = []
-    for (filename, parser) in optional_data_source:
-        if filename:
-            with open(filename, encoding=encoding) as file:
-                optional_source.append(parser(file))
-        else:
-            optional_source.append(parser([]))
+    with measure(stats, 'load'):
+        for (filename, parser) in optional_data_source:
+            if not filename:
+                optional_source.append(parser([]))
+            elif parser is AnswersParser:
+                optional_source.append(
+                    parser(AnswersFile(filename, encoding)))
+            else:
+                with open(filename, encoding=encoding) as file:
+                    optional_source.append(parser(file))
+
+    if checkpoint:
+        from checkpoint import Checkpoint
+        checkpoint = Checkpoint(checkpoint)
+        offsets = checkpoint.offsets
+    else:
+        (checkpoint, offsets) = (None, None)
+
+    logs = LogFiles(
+        logs_file, encoding, buffer_size, sort=sort_logs, offsets=offsets,
+        use_mmap=use_mmap)
+    if multi_course:
+        if checkpoint or spill:
+            raise ValueError(
+                'Multi-course mode does not support checkpoints or spilling')
+        parser = MultiCourseParser(
+            logs, *optional_source, workers=workers,
+            json_decoder=json_decoder, stats=stats, pipeline=pipeline)
+        (directory, prefix) = os.path.split(output)
+        directories = get_course_directories(parser.parsers)
+        for (course_name, course_parser) in parser.parsers.items():
+            course_directory = os.path.join(
+                directory, directories[course_name])
+            os.makedirs(course_directory, exist_ok=True)
+            write(
+                os.path.join(course_directory, prefix), encoding,
+                course_parser, backend, sparse, workers, stats)
+        return
 
-    with open(logs_file, encoding=encoding) as logfile:
-        parser = LogParser(logfile, *optional_source)
+    store = None
+    if spill:
+        from store import Store
+        store = Store(spill)
+    try:
+        parser = LogParser(
+            logs, *optional_source, workers=workers, checkpoint=checkpoint,
+            store=store, json_decoder=json_decoder, stats=stats,
+            pipeline=pipeline)
 
-    process_all_csvs(output, encoding, parser)
+        write(output, encoding, parser, backend, sparse, workers, stats)
+    finally:
+        if store is not None:
+            store.close()
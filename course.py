@@ -55,3 +55,12 @@ class CourseParser:
             for item in middle:
                 if any(map(lambda type_: type_ in item, self.TYPES)):
                     self.content[item] = module_id
+
+    def select(self, course_id):
+        course = CourseParser([])
+        course.modules = self.modules
+        course.content = {
+            content_id: module_id
+            for (content_id, module_id) in self.content.items()
+            if utils.get_course_key(content_id) == course_id}
+        return course
@@ -1,18 +1,32 @@
 import abc
+import collections
+import concurrent.futures
 import contextlib
 import csv
+import functools
+import itertools
 import json
 import logging
 import operator
 import os.path
+import time
+from datetime import datetime
 
+import utils
 
-__all__ = ['process_all_csvs']
+
+__all__ = ['process_all', 'process_all_csvs', 'BACKENDS']
+
+
+BUFFER_SIZE = 1 << 20
+CHUNK_SIZE = 10000
 
 
 class BaseProcessor(metaclass=abc.ABCMeta):
     def __init__(self, filename, encoding):
-        self._file = open(filename, mode='w', encoding=encoding)
+        self.filename = filename
+        self._file = open(
+            filename, mode='w', encoding=encoding, buffering=BUFFER_SIZE)
 
     @abc.abstractmethod
     def process(self, parser):
@@ -25,14 +39,51 @@ class BaseProcessor(metaclass=abc.ABCMeta):
         self._file.close()
 
 
+def iter_chunks(iterable):
+    iterator = iter(iterable)
+    while True:
+        rows = [tuple(map(str, item))
+                for item in itertools.islice(iterator, CHUNK_SIZE)]
+        if not rows:
+            return
+        yield rows
+
+
+def validate_rows(columns, rows):
+    invalid = [
+        Checkers.invalid_values(checker, column)
+        for (column, (_, checker)) in zip(zip(*rows), columns)]
+    if not any(invalid):
+        return rows
+    return [row for row in rows if check_row(columns, row, invalid)]
+
+
+def check_row(columns, row, invalid):
+    for (item, values, (name, _)) in zip(row, invalid, columns):
+        if item in values:
+            logging.warning('Invalid item "%s" in %s. Skip', name, row)
+            return False
+    return True
+
+
 class BaseCSVProcessor(BaseProcessor):
     COLUMNS = []
+    INDEX = None
 
-    def __init__(self, prefix, index, encoding):
-        super().__init__('{}{}.csv'.format(prefix, index), encoding)
+    def __init__(self, prefix, encoding, **options):
+        super().__init__('{}{}.csv'.format(prefix, self.INDEX), encoding)
+        self._options = options
         self._csv = csv.writer(self._file, delimiter=';')
         self._csv.writerow(map(operator.itemgetter(0), self.COLUMNS))
 
+    @staticmethod
+    @abc.abstractmethod
+    def rows(parser, **options):
+        pass
+
+    def process(self, parser):
+        self.writeiter(self.rows(parser, **self._options))
+
     def write(self, *items):
         row = tuple(map(str, items))
         for (item, (name, checker)) in zip(row, self.COLUMNS):
@@ -42,8 +93,21 @@ class BaseCSVProcessor(BaseProcessor):
         self._csv.writerow(row)
 
     def writeiter(self, iterable):
-        for item in iterable:
-            self.write(*item)
+        for rows in iter_chunks(iterable):
+            self.writerows(rows)
+
+    def writerows(self, rows):
+        rows = validate_rows(self.COLUMNS, rows)
+        if not rows:
+            return
+
+        text = '\r\n'.join(map(';'.join, rows)) + '\r\n'
+        if (min(map(len, rows)) > 1 and '"' not in text and
+                text.count(';') == sum(map(len, rows)) - len(rows) and
+                text.count('\n') == text.count('\r') == len(rows)):
+            self._file.write(text)
+        else:
+            self._csv.writerows(rows)
 
 
 class Checkers:
@@ -71,6 +135,19 @@ class Checkers:
             return int(value) >= 0
         return False
 
+    @staticmethod
+    def invalid_values(checker, column):
+        forbidden = INVALID_VALUES.get(checker)
+        if forbidden is not None:
+            return {value for value in forbidden if value in column}
+        return {value for value in set(column) if not checker(value)}
+
+
+INVALID_VALUES = {
+    Checkers.nonempty: ('',),
+    Checkers.non_empty_or_none: ('', 'None'),
+}
+
 
 class Items:
     USER_ID = ('user_id', Checkers.nonempty)
@@ -100,11 +177,11 @@ class CSV1(BaseCSVProcessor):
     COLUMNS = [
         Items.USER_ID, Items.ITEM_ID, Items.CORRECT, Items.TIME]
 
-    def __init__(self, prefix, encoding):
-        super().__init__(prefix, 1, encoding)
+    INDEX = 1
 
-    def process(self, parser):
-        self.writeiter(parser.get_student_solutions())
+    @staticmethod
+    def rows(parser, **options):
+        return parser.get_student_solutions()
 
 
 class CSV2(BaseCSVProcessor):
@@ -112,21 +189,21 @@ class CSV2(BaseCSVProcessor):
         Items.ITEM_ID, Items.ITEM_TYPE, Items.ITEM_NAME,
         Items.MODULE_ID, Items.MODULE_ORDER, Items.MODULE_NAME]
 
-    def __init__(self, prefix, encoding):
-        super().__init__(prefix, 2, encoding)
+    INDEX = 2
 
-    def process(self, parser):
-        self.writeiter(parser.get_tasks())
+    @staticmethod
+    def rows(parser, **options):
+        return parser.get_tasks()
 
 
 class CSV3(BaseCSVProcessor):
     COLUMNS = [Items.USER_ID, Items.CONTENT_ID, Items.VIEWED]
 
-    def __init__(self, prefix, encoding):
-        super().__init__(prefix, 3, encoding)
+    INDEX = 3
 
-    def process(self, parser):
-        self.writeiter(parser.get_student_content())
+    @staticmethod
+    def rows(parser, sparse=False, **options):
+        return parser.get_student_content(sparse=sparse)
 
 
 class CSV4(BaseCSVProcessor):
@@ -134,11 +211,11 @@ class CSV4(BaseCSVProcessor):
         Items.CONTENT_ID, Items.CONTENT_TYPE, Items.CONTENT_NAME,
         Items.MODULE_ID, Items.MODULE_ORDER, Items.MODULE_NAME]
 
-    def __init__(self, prefix, encoding):
-        super().__init__(prefix, 4, encoding)
+    INDEX = 4
 
-    def process(self, parser):
-        self.writeiter(parser.get_content())
+    @staticmethod
+    def rows(parser, **options):
+        return parser.get_content()
 
 
 class CSV5(BaseCSVProcessor):
@@ -146,11 +223,11 @@ class CSV5(BaseCSVProcessor):
         Items.USER_ID, Items.ITEM_ID, Items.REVIEWER_ID,
         Items.SCORE, Items.MAX_SCORE]
 
-    def __init__(self, prefix, encoding):
-        super().__init__(prefix, 5, encoding)
+    INDEX = 5
 
-    def process(self, parser):
-        self.writeiter(parser.get_assessments())
+    @staticmethod
+    def rows(parser, **options):
+        return parser.get_assessments()
 
 
 class CourseInfoJSON(BaseProcessor):
@@ -162,7 +239,182 @@ class CourseInfoJSON(BaseProcessor):
         json.dump(parser.get_course_info(), self._file)
 
 
-def process_all_csvs(prefix, encoding, parser):
-    for processor in (CSV1, CSV2, CSV3, CSV4, CSV5, CourseInfoJSON):
-        with processor(prefix, encoding) as p:
-            p.process(parser)
+COLUMN_TYPES = {
+    Items.MODULE_ORDER: 'int',
+    Items.SCORE: 'int',
+    Items.MAX_SCORE: 'int',
+    Items.CORRECT: 'int',
+    Items.VIEWED: 'int',
+    Items.TIME: 'timestamp',
+}
+
+
+def import_pyarrow(format_):
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError(
+            'pyarrow is required for the {} output format'.format(format_))
+    return pyarrow
+
+
+@functools.lru_cache(maxsize=65536)
+def parse_time(value):
+    try:
+        if utils.ISO_DATETIME.match(value):
+            value = utils.convert_datetime(value)
+        return datetime.strptime(value, '%d.%m.%Y %H:%M:%S')
+    except ValueError:
+        logging.warning('Invalid time "%s". Write null', value)
+        return None
+
+
+class TableWriter:
+    CONVERTERS = {'int': int, 'timestamp': parse_time, 'str': str}
+
+    def __init__(self, filename, format_, columns):
+        pyarrow = import_pyarrow(format_)
+        types = {
+            'int': pyarrow.int64(),
+            'timestamp': pyarrow.timestamp('s'),
+            'str': pyarrow.string(),
+        }
+        self._pyarrow = pyarrow
+        self._types = [COLUMN_TYPES.get(column, 'str') for column in columns]
+        self._schema = pyarrow.schema([
+            (name, types[type_])
+            for ((name, _), type_) in zip(columns, self._types)])
+        if format_ == 'parquet':
+            self._writer = pyarrow.parquet.ParquetWriter(
+                filename, self._schema)
+        else:
+            self._writer = pyarrow.ipc.new_file(filename, self._schema)
+
+    def write(self, rows):
+        columns = [
+            list(map(self.CONVERTERS[type_], column))
+            for (column, type_) in zip(zip(*rows), self._types)]
+        self._writer.write_table(self._pyarrow.Table.from_arrays(
+            [self._pyarrow.array(column, field.type)
+             for (column, field) in zip(columns, self._schema)],
+            schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+
+class ColumnarProcessor:
+    def __init__(self, table, prefix, encoding, format_, **options):
+        self.filename = '{}{}.{}'.format(prefix, table.INDEX, format_)
+        self._table = table
+        self._options = options
+        self._writer = TableWriter(self.filename, format_, table.COLUMNS)
+
+    def process(self, parser):
+        rows = self._table.rows(parser, **self._options)
+        for chunk in iter_chunks(rows):
+            chunk = validate_rows(self._table.COLUMNS, chunk)
+            if chunk:
+                self._writer.write(chunk)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self._writer.close()
+
+
+class CourseInfoTable:
+    COLUMNS = [
+        ('short_name', Checkers.nonempty),
+        ('long_name', Checkers.nonempty),
+        ('roo_course_id', Checkers.nonempty)]
+
+    def __init__(self, prefix, encoding, format_, **options):
+        self.filename = os.path.join(
+            os.path.dirname(prefix), 'course.{}'.format(format_))
+        self._writer = TableWriter(self.filename, format_, self.COLUMNS)
+
+    def process(self, parser):
+        info = parser.get_course_info()
+        self._writer.write(
+            [tuple(str(info[name]) for (name, _) in self.COLUMNS)])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self._writer.close()
+
+
+TABLES = [CSV1, CSV2, CSV3, CSV4, CSV5]
+BACKENDS = ['csv', 'parquet', 'arrow']
+
+
+def get_processors(backend, **options):
+    if backend == 'csv':
+        return [functools.partial(table, **options) for table in TABLES] + [
+            CourseInfoJSON]
+    if backend in BACKENDS:
+        return [
+            functools.partial(ColumnarProcessor, table, format_=backend,
+                              **options)
+            for table in TABLES] + [
+            functools.partial(CourseInfoTable, format_=backend)]
+    raise ValueError('Unknown output format: {}'.format(backend))
+
+
+_shared_parser = None
+
+
+def run_processor(processor, prefix, encoding, parser=None):
+    start = time.perf_counter()
+    with processor(prefix, encoding) as p:
+        p.process(parser or _shared_parser)
+    return (p.filename, time.perf_counter() - start)
+
+
+def get_fork_context():
+    import multiprocessing
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return None
+
+
+def process_all(prefix, encoding, parser, backend='csv', sparse=False,
+                workers=1):
+    global _shared_parser
+
+    processors = get_processors(backend, sparse=sparse)
+    workers = min(workers, len(processors))
+
+    context = get_fork_context() if workers > 1 else None
+    if workers <= 1:
+        timings = [run_processor(processor, prefix, encoding, parser)
+                   for processor in processors]
+    elif context is not None:
+        _shared_parser = parser
+        try:
+            with context.Pool(workers) as pool:
+                timings = pool.starmap(
+                    run_processor,
+                    [(processor, prefix, encoding)
+                     for processor in processors])
+        finally:
+            _shared_parser = None
+    else:
+        with concurrent.futures.ThreadPoolExecutor(workers) as executor:
+            timings = list(executor.map(
+                lambda processor: run_processor(
+                    processor, prefix, encoding, parser),
+                processors))
+
+    for (filename, seconds) in timings:
+        logging.info('%s written in %.3fs', filename, seconds)
+    return collections.OrderedDict(timings)
+
+
+def process_all_csvs(prefix, encoding, parser, sparse=False, workers=1):
+    return process_all(prefix, encoding, parser, 'csv', sparse, workers)
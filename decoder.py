@@ -0,0 +1,46 @@
+import importlib
+import json
+
+
+__all__ = ['DECODERS', 'get_decoder']
+
+
+DECODERS = ['orjson', 'simdjson', 'ujson', 'json']
+
+
+def import_decoder(name):
+    try:
+        return importlib.import_module(name).loads
+    except ImportError:
+        raise RuntimeError('{} is not installed'.format(name))
+
+
+def get_decoder(name='auto'):
+    if name == 'auto':
+        for candidate in DECODERS[:-1]:
+            try:
+                return get_decoder(candidate)
+            except RuntimeError:
+                pass
+        return json.loads
+    if name not in DECODERS:
+        raise ValueError('Unknown JSON decoder: {}'.format(name))
+    if name == 'json':
+        return json.loads
+
+    return FallbackDecoder(name)
+
+
+class FallbackDecoder:
+    def __init__(self, name):
+        self.name = name
+        self._loads = import_decoder(name)
+
+    def __call__(self, text):
+        try:
+            return self._loads(text)
+        except ValueError:
+            return json.loads(text)
+
+    def __reduce__(self):
+        return (FallbackDecoder, (self.name,))
@@ -1,49 +1,221 @@
+import codecs
 import collections
+import concurrent.futures
 import csv
-import json
+import functools
+import itertools
 import logging
 import re
+import time
 
-from models import Users, Tasks, Modules, Content
-from utils import get_item, get_items, convert_datetime, get_id, Registry
+from decoder import get_decoder
+from models import (
+    Users, ShardUsers, Tasks, Modules, Content, get_url_module_id,
+    update_data)
+from reader import is_ascii_compatible, iter_blocks, open_log
+from stats import Stats, measure
+from utils import (
+    compile_item, compile_items, convert_datetime, get_id, Registry)
 
 
-__all__ = ['LogParser']
+__all__ = ['LogParser', 'MultiCourseParser']
+
+
+COURSE_ID = compile_item('context.course_id')
+USER_ID = compile_item('context.user_id')
+EVENT = compile_item('event')
+PAGE = compile_item('page')
+VIDEO_ID = compile_item('id')
+
+PROBLEM_CHECK = compile_items(['event.problem_id', 'context.user_id', 'time'])
+SUBMISSION = compile_item('event.submission', type_=dict)
+SUBTASK = compile_items(['question', 'response_type'])
+CORRECT = compile_item('correct', type_=bool)
+
+PROBLEM_SUBMITTED = compile_items(
+    ['context.user_id', 'event.problem_id', 'referer', 'time'])
+PROBLEM_SUBMITTED_PATH = compile_items(
+    ['context.user_id', 'event.problem_id', 'context.path', 'time'])
+
+CREATE_SUBMISSION = compile_items(
+    ['event.submission_uuid', 'context.module.usage_key', 'context.user_id',
+     'context.module.display_name', 'referer'])
+ASSESS = compile_items(['event.submission_uuid', 'context.user_id'])
+PARTS = compile_item('event.parts', type_=list)
+POINTS = compile_item('option.points', type_=int)
+POINTS_POSSIBLE = compile_item('criterion.points_possible', type_=int)
+
+
+ENTRY = re.compile(r'.*?({.*})')
+BYTE_ENTRY = re.compile(rb'.*?({.*})')
+
+PIPELINE_DEPTH = 4
+
+
+class EventFilter:
+    EVENT_TYPE = re.compile(r'"event_type"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+    def __init__(self, event_types):
+        self.event_types = event_types
+
+    def __call__(self, line):
+        if self.event_types is None:
+            return True
+        return any(
+            event_type in self.event_types or '\\' in event_type
+            for event_type in self.EVENT_TYPE.findall(line))
+
+
+class ByteEventFilter:
+    EVENT_TYPE = re.compile(rb'"event_type"\s*:\s*"((?:[^"\\]|\\.)*)"')
+    SPACE = rb'[^\S\n]*'
+    ESCAPED = rb'(?:[^"\\\n]|\\.)*\\.(?:[^"\\\n]|\\.)*"'
+
+    def __init__(self, event_types):
+        self.event_types = None
+        if event_types is None:
+            pattern = rb'(?m)^'
+        else:
+            self.event_types = {
+                event_type.encode() for event_type in event_types}
+            values = b'|'.join(
+                map(re.escape, sorted(self.event_types)))
+            pattern = (
+                rb'"event_type"' + self.SPACE + rb':' + self.SPACE +
+                rb'"(?:(?:' + values + rb')"|' + self.ESCAPED + rb')')
+        self.pattern = re.compile(pattern)
+
+    def __call__(self, line):
+        return self.pattern.search(line) is not None and self.check(
+            line, 0, len(line))
+
+    def check(self, block, start, end):
+        if self.event_types is None:
+            return True
+        return any(
+            event_type in self.event_types or b'\\' in event_type
+            for event_type in self.EVENT_TYPE.findall(block, start, end))
+
+    def lines(self, block):
+        last = -1
+        for match in self.pattern.finditer(block):
+            start = block.rfind(b'\n', 0, match.start()) + 1
+            if start == last:
+                continue
+            if start == len(block):
+                return
+            end = block.find(b'\n', match.end())
+            if end < 0:
+                end = len(block)
+            last = start
+            if self.check(block, start, end):
+                yield (start, end)
+
+
+def get_course_name(item):
+    return COURSE_ID(item).split(':', 1)[-1]
+
+
+def get_block_encoding(log):
+    if not hasattr(log, 'iter_blocks'):
+        return None
+    return log.encoding if is_ascii_compatible(log.encoding) else None
+
+
+def get_entry_encoding(encoding):
+    return None if codecs.lookup(encoding).name == 'utf-8' else encoding
+
+
+def count_lines(block):
+    return block.count(b'\n') + (not block.endswith(b'\n'))
+
+
+def block_entries(prefilter, block):
+    (line, position) = (0, 0)
+    for (start, end) in prefilter.lines(block):
+        line += block.count(b'\n', position, start)
+        position = start
+        yield (line, BYTE_ENTRY.findall(block, start, end))
+
+
+def decode_block(block, encoding, loads, multi_course=False):
+    start = time.perf_counter()
+    selected = list(block_entries(LogParser.byte_prefilter, block))
+    filtered = time.perf_counter()
+    recorder = RecordingParser(loads)
+    records = []
+    for (line, entries) in selected:
+        (event_type, course_name, calls, error) = (None, None, None, None)
+        try:
+            entry = entries[-1]
+            if encoding is not None:
+                entry = entry.decode(encoding)
+            item = loads(entry)
+            event_type = item.get('event_type')
+            if multi_course:
+                course_name = get_course_name(item)
+            if course_name or not multi_course:
+                (calls, error) = recorder.record(item)
+            else:
+                calls = []
+        except Exception as e:
+            error = str(e)
+        records.append((line, event_type, course_name, calls, error))
+    return (count_lines(block), records, filtered - start,
+            time.perf_counter() - filtered)
+
+
+def parse_shard(shard, multi_course=False, json_decoder='auto',
+                use_mmap=True, stats=False):
+    parser = MultiShardParser() if multi_course else ShardParser()
+    parser.loads = get_decoder(json_decoder)
+    if stats:
+        parser.stats = Stats()
+    (filename, encoding, start, end) = shard
+    if is_ascii_compatible(encoding):
+        parser._parse_blocks(
+            iter_blocks(filename, start, end, use_mmap=use_mmap), encoding)
+    else:
+        with open_log(filename, encoding, threaded=False) as file:
+            parser._parse(file)
+    return parser
 
 
 class LogParser:
     handler = Registry()
 
+    multi_course = False
+    json_decoder = 'auto'
+
     def _update_course(self, item):
-        self.course_name = (
-            get_item(item, 'context.course_id').split(':', 1)[-1] or
-            self.course_name)
+        self._set_course_name(get_course_name(item))
+
+    def _set_course_name(self, course_name):
+        self.course_name = course_name or self.course_name
 
     @handler.add(event_type=['load_video', 'edx.video.loaded'])
     def _load_video(self, item):
         self._update_course(item)
-        video_id = get_item(json.loads(get_item(item, 'event')), 'id')
-        page = get_item(item, 'page')
+        video_id = VIDEO_ID(self.loads(EVENT(item)))
+        page = PAGE(item)
         self.content.add_content('video', video_id)
         self.modules.add_content(page, video_id)
 
     @handler.add(event_type=['play_video', 'edx.video.played'])
     def _play_video(self, item):
         self._update_course(item)
-        user_id = get_item(item, 'context.user_id')
-        video_id = get_item(json.loads(get_item(item, 'event')), 'id')
+        user_id = USER_ID(item)
+        video_id = VIDEO_ID(self.loads(EVENT(item)))
         self.users.view_content(user_id, video_id)
 
     @handler.add(event_type='problem_check', event_source='server')
     def _problem_check_server(self, item):
         self._update_course(item)
-        (problem_id, user_id, time) = get_items(
-            item, ['event.problem_id', 'context.user_id', 'time'])
-        subtasks = get_item(item, 'event.submission', type_=dict)
+        (problem_id, user_id, time) = PROBLEM_CHECK(item)
+        subtasks = SUBMISSION(item)
         for (subtask_id, subtask) in subtasks.items():
-            (question, task_type) = get_items(
-                subtask, ['question', 'response_type'])
-            correct = get_item(subtask, 'correct', type_=bool)
+            (question, task_type) = SUBTASK(subtask)
+            correct = CORRECT(subtask)
             self.tasks.add_task(problem_id, subtask_id, question, task_type)
             self.users.score_task(
                 user_id, problem_id, subtask_id, correct, time)
@@ -52,12 +224,10 @@ class LogParser:
     def _problem_submitted(self, item):
         self._update_course(item)
         try:
-            (user_id, problem_id, page, time) = get_items(
-                item, ['context.user_id', 'event.problem_id', 'referer', 'time'])
+            (user_id, problem_id, page, time) = PROBLEM_SUBMITTED(item)
             self.modules.add_task(page, problem_id)
         except:
-            (user_id, problem_id, page, time) = get_items(
-                item, ['context.user_id', 'event.problem_id', 'context.path', 'time'])
+            (user_id, problem_id, page, time) = PROBLEM_SUBMITTED_PATH(item)
             self.modules.add_task(page, problem_id)
 
         self.users.post_solution(user_id, problem_id, convert_datetime(time))
@@ -65,10 +235,8 @@ class LogParser:
     @handler.add(event_type='openassessmentblock.create_submission')
     def _create_submission(self, item):
         self._update_course(item)
-        (submission_id, task_id, user_id, name, page) = get_items(
-            item, ['event.submission_uuid', 'context.module.usage_key',
-                   'context.user_id', 'context.module.display_name',
-                   'referer'])
+        (submission_id, task_id, user_id, name, page) = CREATE_SUBMISSION(
+            item)
         self.users.create_submission(submission_id, user_id, task_id)
         self.modules.add_task(page, task_id)
         self.tasks.add_assessment(task_id, name)
@@ -78,39 +246,252 @@ class LogParser:
                              'openassessmentblock.staff_assess'])
     def _assess_submission(self, item):
         self._update_course(item)
-        (submission_id, user_id) = get_items(
-            item, ['event.submission_uuid', 'context.user_id'])
-        scores = get_item(item, 'event.parts', type_=list)
-        points = sum(
-            get_item(score, 'option.points', type_=int) for score in scores)
-        max_points = sum(
-            get_item(score, 'criterion.points_possible', type_=int)
-            for score in scores)
+        (submission_id, user_id) = ASSESS(item)
+        scores = PARTS(item)
+        points = sum(POINTS(score) for score in scores)
+        max_points = sum(POINTS_POSSIBLE(score) for score in scores)
         self.users.assess(submission_id, user_id, points, max_points)
 
-    def __init__(self, log, course, answers, courses):
-        self.course_name = ''
-        self.users = Users()
-        self.tasks = Tasks()
-        self.modules = Modules()
-        self.content = Content()
+    prefilter = EventFilter(handler.values('event_type'))
+    byte_prefilter = ByteEventFilter(handler.values('event_type'))
+    stats = None
 
-        self._parse(log)
+    def __init__(self, log, course, answers, courses, *, workers=1,
+                 checkpoint=None, store=None, json_decoder='auto',
+                 stats=None, pipeline=False):
+        self.stats = stats
+        self._init_decoder(json_decoder)
+        if store is None:
+            self._init_models(Users())
+        elif checkpoint is not None:
+            raise ValueError('Checkpoints are not supported with a store')
+        else:
+            from store import DiskUsers, DiskTasks, DiskModules
+            self._init_models(
+                DiskUsers(store), DiskTasks(store), DiskModules(store))
+        if checkpoint is not None:
+            checkpoint.restore(self)
+
+        with measure(stats, 'parse'):
+            self._parse_all(log, workers, pipeline)
+        logging.info(
+            'Processed %d log lines: %d decoded, %d skipped', self.lines,
+            self.lines_decoded, self.lines_skipped)
+        if stats is not None:
+            stats.count_lines(self)
+
+        if checkpoint is not None:
+            with measure(stats, 'checkpoint'):
+                checkpoint.save(self, log)
+
+        with measure(stats, 'update_data'):
+            self._update_data(course, answers, courses)
+            if store is not None:
+                store.flush()
 
-        for item in (self.users, self.tasks, self.modules, self.content):
-            item.update_data(course, answers)
+    def _update_data(self, course, answers, courses):
+        update_data(
+            course, answers, self.users, self.tasks, self.modules,
+            self.content)
 
         self.course_long_name = courses.get_name(self.course_name)
         self.roo_id = courses.get_ro_id(self.course_name)
 
+    def _init_decoder(self, json_decoder):
+        self.json_decoder = json_decoder
+        self.loads = get_decoder(json_decoder)
+
+    def _init_models(self, users, tasks=None, modules=None):
+        self.course_name = ''
+        self.lines = 0
+        self.lines_decoded = 0
+        self.lines_skipped = 0
+        self.users = users
+        self.tasks = Tasks() if tasks is None else tasks
+        self.modules = Modules() if modules is None else modules
+        self.content = Content()
+
+    def _parse_all(self, log, workers, pipeline):
+        if workers <= 1:
+            self._parse_log(log)
+        elif pipeline:
+            self._parse_pipeline(log, workers)
+        else:
+            self._parse_parallel(log, workers)
+
+    def _parse_log(self, log):
+        encoding = get_block_encoding(log)
+        if encoding is not None:
+            self._parse_blocks(log.iter_blocks(), encoding)
+        else:
+            self._parse(log)
+
     def _parse(self, log):
-        for (i, line) in enumerate(log):
+        if self.stats is not None:
+            self._parse_timed(log)
+            return
+        for (i, line) in enumerate(log, self.lines + 1):
+            self.lines = i
+            if not self.prefilter(line):
+                self.lines_skipped += 1
+                continue
+            self.lines_decoded += 1
+            self._parse_entry(i, ENTRY.findall(line))
+
+    def _parse_timed(self, log):
+        stats = self.stats
+        log = stats.iterate('parse.read', log)
+        for (i, line) in enumerate(log, self.lines + 1):
+            self.lines = i
+            start = time.perf_counter()
+            entries = ENTRY.findall(line) if self.prefilter(line) else None
+            stats.add('parse.filter', time.perf_counter() - start)
+            if entries is None:
+                self.lines_skipped += 1
+                continue
+            self.lines_decoded += 1
+            self._parse_entry(i, entries)
+
+    def _parse_blocks(self, blocks, encoding):
+        encoding = get_entry_encoding(encoding)
+        if self.stats is not None:
+            blocks = self.stats.iterate('parse.read', blocks)
+        for block in blocks:
+            decoded = 0
+            for (line, entries) in self._block_entries(block):
+                decoded += 1
+                self._parse_entry(self.lines + 1 + line, entries, encoding)
+
+            lines = count_lines(block)
+            self.lines += lines
+            self.lines_decoded += decoded
+            self.lines_skipped += lines - decoded
+
+    def _block_entries(self, block):
+        entries = block_entries(self.byte_prefilter, block)
+        if self.stats is None:
+            return entries
+        start = time.perf_counter()
+        entries = list(entries)
+        self.stats.add('parse.filter', time.perf_counter() - start)
+        return entries
+
+    def _parse_entry(self, line, entries, encoding=None):
+        if self.stats is not None:
+            self._parse_entry_timed(line, entries, encoding)
+            return
+        try:
+            entry = entries[-1]
+            if encoding is not None:
+                entry = entry.decode(encoding)
+            self._dispatch(self.loads(entry))
+        except Exception as e:
+            self._report_error(line, e)
+
+    def _parse_entry_timed(self, line, entries, encoding):
+        (start, decoded) = (time.perf_counter(), None)
+        try:
+            entry = entries[-1]
+            if encoding is not None:
+                entry = entry.decode(encoding)
+            item = self.loads(entry)
+            decoded = time.perf_counter()
+            self._dispatch(item)
+            self.stats.handlers[item.get('event_type')] += 1
+        except Exception as e:
+            self._report_error(line, e)
+        end = time.perf_counter()
+        if decoded is None:
+            decoded = end
+        self.stats.add('parse.decode', decoded - start)
+        self.stats.add('parse.dispatch', end - decoded)
+
+    def _dispatch(self, item):
+        LogParser.handler(self, item)
+
+    def _replay(self, course_name, calls):
+        for (model, method, args) in calls:
+            target = self if model is None else getattr(self, model)
+            getattr(target, method)(*args)
+
+    def _report_error(self, line, error):
+        logging.warning('Error on process entry, line %d: %s', line, error)
+        if self.stats is not None:
+            self.stats.errors += 1
+
+    def _parse_parallel(self, log, workers):
+        shards = log.shards(workers) if hasattr(log, 'shards') else []
+        if len(shards) < 2:
+            self._parse_log(log)
+            return
+        with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+            parse = functools.partial(
+                parse_shard, multi_course=self.multi_course,
+                json_decoder=self.json_decoder, use_mmap=log.use_mmap,
+                stats=self.stats is not None)
+            for shard in executor.map(parse, shards):
+                self._merge(shard)
+
+    def _parse_pipeline(self, log, workers):
+        encoding = get_block_encoding(log)
+        if encoding is None:
+            self._parse_log(log)
+            return
+
+        decode = functools.partial(
+            decode_block, encoding=get_entry_encoding(encoding),
+            loads=self.loads, multi_course=self.multi_course)
+        blocks = log.iter_blocks()
+        if self.stats is not None:
+            blocks = self.stats.iterate('parse.read', blocks)
+        with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+            pending = collections.deque()
+            for block in blocks:
+                pending.append(executor.submit(decode, block))
+                if len(pending) >= workers * PIPELINE_DEPTH:
+                    self._apply_block(*pending.popleft().result())
+            while pending:
+                self._apply_block(*pending.popleft().result())
+
+    def _apply_block(self, lines, records, filter_seconds, decode_seconds):
+        stats = self.stats
+        for (line, event_type, course_name, calls, error) in records:
+            start = time.perf_counter()
             try:
-                item = json.loads(re.findall(r'.*?({.*})', line)[-1])
-                LogParser.handler(self, item)
+                if calls is not None:
+                    self._replay(course_name, calls)
+                if error is None and stats is not None:
+                    stats.handlers[event_type] += 1
             except Exception as e:
-                logging.warning(
-                    'Error on process entry, line %d: %s', i + 1, e)
+                error = e
+            if error is not None:
+                self._report_error(self.lines + 1 + line, error)
+            if stats is not None:
+                stats.add('parse.dispatch', time.perf_counter() - start)
+        if stats is not None:
+            stats.add_worker('parse.filter', filter_seconds)
+            stats.add_worker('parse.decode', decode_seconds)
+
+        self.lines += lines
+        self.lines_decoded += len(records)
+        self.lines_skipped += lines - len(records)
+
+    def _merge(self, other):
+        self._merge_models(other)
+        for (line, error) in other.errors:
+            self._report_error(self.lines + line, error)
+        self.lines += other.lines
+        self.lines_decoded += other.lines_decoded
+        self.lines_skipped += other.lines_skipped
+        if self.stats is not None and other.stats is not None:
+            self.stats.merge(other.stats)
+
+    def _merge_models(self, other):
+        self.course_name = other.course_name or self.course_name
+        for (item, part) in zip(
+                (self.users, self.tasks, self.modules, self.content),
+                (other.users, other.tasks, other.modules, other.content)):
+            item.merge(part)
 
     def get_course_info(self):
         return {
@@ -121,25 +502,39 @@ class LogParser:
         }
 
     def get_student_solutions(self, user_id=None):
+        for (user, subtask_id, time, correct) in self.users.iter_submits():
+            if user_id is None or user == user_id:
+                yield (user, subtask_id, correct, time)
+
+    def get_module_content(self):
+        return [
+            content_id
+            for (_, content) in self.content.content.items()
+            for content_id in content
+            if self.modules.get_content_module(content_id)]
+
+    def get_student_content(self, user_id=None, *, sparse=False):
+        ids = self.users.ids
         if user_id is None:
-            for userid in self.users.submits:
-                yield from self.get_student_solutions(userid)
+            users = list(self.users.viewed_content)
         else:
-            submits = self.users.submits[user_id]
-            for (taskid, tries) in submits.items():
-                for (time, correct) in tries:
-                    yield (user_id, taskid, correct, time)
+            users = [ids(user_id)]
 
-    def get_student_content(self, user_id=None):
-        if user_id is None:
-            for userid in self.users.viewed_content:
-                yield from self.get_student_content(userid)
+        content = self.get_module_content()
+        if sparse:
+            content = set(content)
         else:
-            viewed = self.users.viewed_content[user_id]
-            for (_, content) in self.content.content.items():
-                for content_id in content:
-                    if self.modules.get_content_module(content_id):
-                        yield (user_id, content_id, int(content_id in viewed))
+            codes = list(map(ids.get, content))
+        for user in users:
+            user_id = ids[user]
+            viewed = set(self.users.viewed_content[user])
+            if sparse:
+                for code in viewed:
+                    if ids[code] in content:
+                        yield (user_id, ids[code], 1)
+            else:
+                for (content_id, code) in zip(content, codes):
+                    yield (user_id, content_id, int(code in viewed))
 
     def get_assessments(self):
         for submission_id in self.users.pr_submits:
@@ -151,7 +546,8 @@ class LogParser:
 
     def get_tasks(self, task_id=None):
         if task_id is None:
-            task_ids = set(self.tasks.tasks) | set(self.tasks.assessments)
+            task_ids = dict.fromkeys(itertools.chain(
+                self.tasks.tasks, self.tasks.assessments))
             for taskid in task_ids:
                 yield from self.get_tasks(taskid)
         else:
@@ -173,3 +569,131 @@ class LogParser:
                 module = self.modules.get_content_module(content_id)
                 if module:
                     yield (content_id, content_type, 'NA', *module)
+
+
+class ShardParser(LogParser):
+    def __init__(self):
+        self._init_models(ShardUsers())
+        self.errors = []
+
+    def _report_error(self, line, error):
+        self.errors.append((line, str(error)))
+
+
+class CallRecorder:
+    def __init__(self, name, calls):
+        self._name = name
+        self._calls = calls
+
+    def __getattr__(self, method):
+        def record(*args):
+            self._calls.append((self._name, method, args))
+        return record
+
+
+class ModulesRecorder(CallRecorder):
+    def add_task(self, link, problem_id, normalize=True):
+        self._add_link('add_task', link, problem_id, normalize)
+
+    def add_content(self, link, content_id, normalize=True):
+        self._add_link('add_content', link, content_id, normalize)
+
+    def _add_link(self, method, link, item_id, normalize):
+        if normalize:
+            link = get_url_module_id(link)
+        self._calls.append((self._name, method, (link, item_id, False)))
+
+
+class RecordingParser(LogParser):
+    def __init__(self, loads):
+        self.loads = loads
+        self.calls = []
+        self.users = CallRecorder('users', self.calls)
+        self.tasks = CallRecorder('tasks', self.calls)
+        self.modules = ModulesRecorder('modules', self.calls)
+        self.content = CallRecorder('content', self.calls)
+
+    def _set_course_name(self, course_name):
+        self.calls.append((None, '_set_course_name', (course_name,)))
+
+    def record(self, item):
+        del self.calls[:]
+        try:
+            LogParser.handler(self, item)
+        except Exception as e:
+            return (list(self.calls), str(e))
+        return (list(self.calls), None)
+
+
+class CourseLogParser(LogParser):
+    def __init__(self, course_name, users):
+        self._init_models(users)
+        self.course_name = course_name
+
+
+class MultiCourseParser(LogParser):
+    multi_course = True
+
+    def __init__(self, log, course, answers, courses, *, workers=1,
+                 json_decoder='auto', stats=None, pipeline=False):
+        self.stats = stats
+        self._init_decoder(json_decoder)
+        self._init_courses(Users)
+
+        with measure(stats, 'parse'):
+            self._parse_all(log, workers, pipeline)
+        logging.info(
+            'Processed %d log lines: %d decoded, %d skipped, %d courses, '
+            '%d events without course', self.lines, self.lines_decoded,
+            self.lines_skipped, len(self.parsers), self.lines_unassigned)
+        if stats is not None:
+            stats.count_lines(self)
+
+        with measure(stats, 'update_data'):
+            for (course_name, parser) in self.parsers.items():
+                parser._update_data(
+                    course.select(course_name), answers.select(course_name),
+                    courses)
+
+    def _init_courses(self, users):
+        self.lines = 0
+        self.lines_decoded = 0
+        self.lines_skipped = 0
+        self.lines_unassigned = 0
+        self.parsers = collections.OrderedDict()
+        self._users = users
+
+    def _get_parser(self, course_name):
+        parser = self.parsers.get(course_name)
+        if parser is None:
+            parser = self.parsers[course_name] = CourseLogParser(
+                course_name, self._users())
+            parser.loads = self.loads
+        return parser
+
+    def _dispatch(self, item):
+        course_name = get_course_name(item)
+        if course_name:
+            LogParser.handler(self._get_parser(course_name), item)
+        else:
+            self.lines_unassigned += 1
+
+    def _replay(self, course_name, calls):
+        if course_name:
+            LogParser._replay(
+                self._get_parser(course_name), course_name, calls)
+        else:
+            self.lines_unassigned += 1
+
+    def _merge_models(self, other):
+        for (course_name, parser) in other.parsers.items():
+            self._get_parser(course_name)._merge_models(parser)
+        self.lines_unassigned += other.lines_unassigned
+
+
+class MultiShardParser(MultiCourseParser):
+    def __init__(self):
+        self._init_courses(ShardUsers)
+        self.errors = []
+
+    _report_error = ShardParser._report_error
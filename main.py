@@ -1,37 +1,116 @@
 #!/usr/bin/env python3
 
 import argparse
+import json
+import logging
 import os.path
 import sys
 
-import converter
+import csv5
+import decoder
+import reader
 
 
-def parse_args():
-    parser = argparse.ArgumentParser()
+def get_parser(parser_class=argparse.ArgumentParser):
+    parser = parser_class()
     parser.add_argument(
         '-e', '--encoding', type=str, default='utf8', help='Files encoding')
     parser.add_argument(
-        '-l', '--logs', type=str, required=True, help='Log file')
+        '-l', '--logs', type=str, action='append', required=True,
+        help='Log file, directory or glob pattern (plain text, gzip, bz2 '
+             'or xz). May be given several times')
+    parser.add_argument(
+        '--no-sort-logs', dest='sort_logs', action='store_false',
+        help='Parse log files in the given order instead of ordering them '
+             'by their first timestamp')
+    parser.add_argument(
+        '--no-mmap', dest='use_mmap', action='store_false',
+        help='Read uncompressed log files with buffered reads instead of '
+             'memory-mapping them')
     parser.add_argument(
         '-c', '--course', type=str, help='Course structure file')
     parser.add_argument(
         '-a', '--answers', type=str, help='Student answers file')
     parser.add_argument(
         '-C', '--courses', type=str, help='Course names file')
+    parser.add_argument(
+        '-w', '--workers', type=int, default=1,
+        help='Number of processes to parse log files and write results with')
+    parser.add_argument(
+        '-p', '--pipeline', action='store_true',
+        help='Decode log entries in --workers processes and apply them to '
+             'the result in log order, instead of parsing parts of the logs '
+             'independently and merging the results')
+    parser.add_argument(
+        '-b', '--buffer-size', type=int, default=reader.BUFFER_SIZE,
+        help='Log file read buffer size in bytes')
+    parser.add_argument(
+        '-s', '--checkpoint', type=str,
+        help='Parser state file. If it exists, only log data added since '
+             'the previous run is parsed; it is updated after parsing')
+    parser.add_argument(
+        '--spill', type=str, metavar='DIR',
+        help='Keep parser state in a temporary on-disk store in DIR '
+             'instead of memory')
+    parser.add_argument(
+        '-m', '--multi-course', action='store_true',
+        help='Split the logs by course and write the result for each course '
+             'to its own subdirectory of the output directory')
+    parser.add_argument(
+        '-j', '--json-decoder', type=str, default='auto',
+        choices=['auto'] + decoder.DECODERS,
+        help='JSON library to decode log entries with (default: the fastest '
+             'installed one)')
+    parser.add_argument(
+        '--sparse', action='store_true',
+        help='Write only viewed content to csv3')
+    parser.add_argument(
+        '-f', '--format', type=str, choices=csv5.BACKENDS, default='csv',
+        help='Output format')
+    parser.add_argument(
+        '--stats', type=str, metavar='FILE',
+        help='Write per-stage timings, event counts and peak memory as JSON '
+             'to FILE ("-" for stdout)')
+    parser.add_argument(
+        '--profile', type=str, metavar='FILE',
+        help='Write cProfile statistics of the main process to FILE')
+    parser.add_argument(
+        '-v', '--verbose', action='store_true',
+        help='Report progress and timings')
     parser.add_argument('output', type=str, help='Output csv prefix')
-    return parser.parse_args()
+    return parser
 
 
-def main():
-    params = parse_args()
+def run(params):
+    import converter
 
     if os.path.isdir(params.output):
         params.output = os.path.join(params.output, 'csv')
 
-    converter.convert(
+    return converter.convert(
         params.course, params.answers, params.courses, params.logs,
-        params.encoding, params.output)
+        params.encoding, params.output, params.workers, params.buffer_size,
+        params.sort_logs, params.checkpoint, params.sparse, params.format,
+        params.spill, params.multi_course, params.json_decoder,
+        params.use_mmap, bool(params.stats), params.profile,
+        params.pipeline)
+
+
+def write_stats(stats, filename):
+    if filename == '-':
+        json.dump(stats, sys.stdout, indent=2)
+        print()
+    elif filename:
+        with open(filename, 'w') as file:
+            json.dump(stats, file, indent=2)
+
+
+def main():
+    params = get_parser().parse_args()
+    if params.verbose:
+        logging.basicConfig(level=logging.INFO)
+
+    write_stats(run(params), params.stats)
 
 
 if __name__ == '__main__':
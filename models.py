@@ -1,11 +1,14 @@
 import abc
 import collections
+import functools
 import re
+from array import array
 
 import utils
 
 
 MODULE_URL = re.compile(r'([^#?]*/)')
+MODULE_CACHE_SIZE = 65536
 
 
 def normalize_module_url(url):
@@ -16,28 +19,144 @@ def get_module_id(url):
     return list(filter(None, url.split('/')))[-2]
 
 
+@functools.lru_cache(maxsize=MODULE_CACHE_SIZE)
+def get_url_module_id(url):
+    return get_module_id(normalize_module_url(url))
+
+
+def update_nonempty(target, source):
+    for (key, value) in source.items():
+        target[key] = value
+
+
+def update_data(course, answers, *models):
+    updaters = [model.answers_updater() for model in models]
+    updaters = [update for update in updaters if update is not None]
+    if updaters:
+        for answer in answers.answers:
+            for update in updaters:
+                update(answer)
+    for model in models:
+        model.update_course(course)
+
+
 class BaseModel(metaclass=abc.ABCMeta):
-    @abc.abstractmethod
     def update_data(self, course, answers):
+        update_data(course, answers, self)
+
+    def answers_updater(self):
+        return None
+
+    def update_course(self, course):
         pass
 
+    @abc.abstractmethod
+    def merge(self, other):
+        pass
+
+
+class Attempts:
+    __slots__ = ('users', 'subtasks', 'times', 'correct', 'raw_times',
+                 'wide_correct')
+
+    def __init__(self):
+        self.users = array('i')
+        self.subtasks = array('i')
+        self.times = array('q')
+        self.correct = array('b')
+        self.raw_times = {}
+        self.wide_correct = {}
+
+    def add(self, user, subtask, time, correct):
+        self._append(user, subtask, utils.to_timestamp(time), time, correct)
+
+    def _append(self, user, subtask, timestamp, time, correct):
+        if timestamp is None:
+            self.raw_times[len(self.users)] = time
+        correct = int(correct)
+        if not -128 <= correct < 128:
+            self.wide_correct[len(self.users)] = correct
+        self.users.append(user)
+        self.subtasks.append(subtask)
+        self.times.append(timestamp or 0)
+        self.correct.append(correct if -128 <= correct < 128 else 0)
+
+    def get_time(self, index):
+        if index in self.raw_times:
+            return self.raw_times[index]
+        return utils.format_timestamp(self.times[index])
+
+    def get_correct(self, index):
+        if index in self.wide_correct:
+            return self.wide_correct[index]
+        return self.correct[index]
+
+    def keys(self):
+        return set(zip(self.users, self.subtasks))
+
+    def __len__(self):
+        return len(self.users)
+
+    def __iter__(self):
+        ranks = {}
+        for user in self.users:
+            ranks.setdefault(user, len(ranks))
+
+        offsets = [0] * (len(ranks) + 1)
+        for user in self.users:
+            offsets[ranks[user] + 1] += 1
+        for rank in range(len(ranks)):
+            offsets[rank + 1] += offsets[rank]
+
+        positions = array('q', bytes(8 * len(self.users)))
+        for (i, user) in enumerate(self.users):
+            positions[offsets[ranks[user]]] = i
+            offsets[ranks[user]] += 1
+
+        start = 0
+        for end in offsets[:-1]:
+            groups = {}
+            for i in positions[start:end]:
+                groups.setdefault(self.subtasks[i], []).append(i)
+            for (subtask, indices) in groups.items():
+                for i in indices:
+                    yield (self.users[i], subtask, self.get_time(i),
+                           self.get_correct(i))
+            start = end
+
+    def merge(self, other, codes, resolved):
+        for (i, (user, subtask, timestamp)) in enumerate(zip(
+                other.users, other.subtasks, other.times)):
+            if i in resolved:
+                time = resolved[i]
+                timestamp = utils.to_timestamp(time)
+            elif i in other.raw_times:
+                (timestamp, time) = (None, other.raw_times[i])
+            else:
+                time = None
+            self._append(
+                codes[user], codes[subtask], timestamp, time,
+                other.get_correct(i))
+
 
 class Users(BaseModel):
+    unresolved = ()
+
     def __init__(self):
-        self.times = collections.defaultdict(
-            lambda: collections.defaultdict(list))
-        self.submits = collections.defaultdict(
-            lambda: collections.defaultdict(list))
+        self.ids = utils.Interner()
+        self.times = {}
+        self.attempts = Attempts()
         self.pr_submits = {}
         self.assessments = collections.defaultdict(list)
         self.viewed_content = collections.defaultdict(set)
 
     def post_solution(self, user_id, problem_id, time):
-        self.times[user_id][problem_id].append(time)
+        self.times[(self.ids(user_id), self.ids(problem_id))] = time
 
     def score_task(self, user_id, problem_id, subtask_id, correct, time=None):
-        time = (self.times[user_id][problem_id] or [time])[-1]
-        self.submits[user_id][subtask_id].append((time, int(correct)))
+        user = self.ids(user_id)
+        time = self.times.get((user, self.ids(problem_id)), time)
+        self.attempts.add(user, self.ids(subtask_id), time, correct)
 
     def create_submission(self, submission_id, user_id, problem_id):
         self.pr_submits[submission_id] = (user_id, problem_id)
@@ -46,35 +165,98 @@ class Users(BaseModel):
         self.assessments[submission_id].append((reviewer, score, max_score))
 
     def view_content(self, user_id, content_id):
-        self.viewed_content[user_id].add(content_id)
-
-    def update_data(self, course, answers):
-        for (taskid, subtaskid, _, userid, time, correct) in answers.answers:
-            time = utils.convert_datetime(time)
-            if not self.submits[userid][subtaskid]:
-                self.post_solution(userid, taskid, time)
+        self.viewed_content[self.ids(user_id)].add(self.ids(content_id))
+
+    def iter_submits(self):
+        for (user, subtask, time, correct) in self.attempts:
+            yield (self.ids[user], self.ids[subtask], time, correct)
+
+    def get_submits(self):
+        submits = {}
+        for (user_id, subtask_id, time, correct) in self.iter_submits():
+            submits.setdefault(user_id, {}).setdefault(subtask_id, []).append(
+                (time, correct))
+        return submits
+
+    def get_viewed_content(self):
+        return {
+            self.ids[user]: {self.ids[content] for content in viewed}
+            for (user, viewed) in self.viewed_content.items()}
+
+    def answers_updater(self):
+        submitted = self.attempts.keys()
+
+        def update(answer):
+            (taskid, subtaskid, _, userid, time, correct) = answer
+            key = (self.ids(userid), self.ids(subtaskid))
+            if key not in submitted:
+                submitted.add(key)
+                self.post_solution(
+                    userid, taskid, utils.convert_datetime(time))
                 self.score_task(userid, taskid, subtaskid, correct)
+        return update
+
+    def merge(self, other):
+        codes = list(map(self.ids, other.ids))
+
+        resolved = {}
+        for (index, problem) in other.unresolved:
+            key = (codes[other.attempts.users[index]], codes[problem])
+            if key in self.times:
+                resolved[index] = self.times[key]
+
+        for ((user, problem), time) in other.times.items():
+            self.times[(codes[user], codes[problem])] = time
+        self.attempts.merge(other.attempts, codes, resolved)
+        self.pr_submits.update(other.pr_submits)
+        for (submission_id, assessments) in other.assessments.items():
+            self.assessments[submission_id].extend(assessments)
+        for (user, viewed) in other.viewed_content.items():
+            self.viewed_content[codes[user]].update(
+                codes[content] for content in viewed)
+
+
+class ShardUsers(Users):
+    def __init__(self):
+        super().__init__()
+        self.unresolved = []
+
+    def score_task(self, user_id, problem_id, subtask_id, correct, time=None):
+        (user, problem) = (self.ids(user_id), self.ids(problem_id))
+        if (user, problem) not in self.times:
+            self.unresolved.append((len(self.attempts), problem))
+        super().score_task(user_id, problem_id, subtask_id, correct, time)
 
 
 class Tasks(BaseModel):
     def __init__(self):
-        self.tasks = collections.defaultdict(set)
+        self.tasks = collections.defaultdict(dict)
         self.subtask_text = utils.NonEmptyDict()
         self.subtask_type = utils.NonEmptyDict()
         self.assessments = utils.NonEmptyDict()
 
     def add_task(self, problem_id, subtask_id, text, type_):
-        self.tasks[problem_id].add(subtask_id)
+        self.tasks[problem_id][subtask_id] = None
         self.subtask_text[subtask_id] = text
         self.subtask_type[subtask_id] = type_
 
     def add_assessment(self, problem_id, name):
         self.assessments[problem_id] = name
 
-    def update_data(self, course, answers):
-        for (problem_id, subtask_id, text, *_) in answers.answers:
-            if subtask_id not in self.subtask_text:
-                self.add_task(problem_id, subtask_id, text, 'NA')
+    def answers_updater(self):
+        return self.add_answer
+
+    def add_answer(self, answer):
+        (problem_id, subtask_id, text, *_) = answer
+        if subtask_id not in self.subtask_text:
+            self.add_task(problem_id, subtask_id, text, 'NA')
+
+    def merge(self, other):
+        for (problem_id, subtasks) in other.tasks.items():
+            self.tasks[problem_id].update(subtasks)
+        update_nonempty(self.subtask_text, other.subtask_text)
+        update_nonempty(self.subtask_type, other.subtask_type)
+        update_nonempty(self.assessments, other.assessments)
 
 
 class Modules(BaseModel):
@@ -82,32 +264,46 @@ class Modules(BaseModel):
         self.tasks = utils.NonEmptyDict()
         self.content = utils.NonEmptyDict()
         self.module_index = {}
+        self.task_modules = {}
+        self.content_modules = {}
 
     def add_task(self, link, problem_id, normalize=True):
         problem_id = utils.get_id(problem_id)
         if normalize:
-            link = get_module_id(normalize_module_url(link))
+            link = get_url_module_id(link)
         self.tasks[problem_id] = link
 
     def add_content(self, link, content_id, normalize=True):
         content_id = utils.get_id(content_id)
         if normalize:
-            link = get_module_id(normalize_module_url(link))
+            link = get_url_module_id(link)
         self.content[content_id] = link
 
     def get_task_module(self, problem_id):
-        problem_id = utils.get_id(problem_id)
-        if problem_id not in self.tasks:
-            return None
-        return self.module_index.get(self.tasks[problem_id], None)
+        return self._get_module(self.task_modules, problem_id)
 
     def get_content_module(self, content_id):
-        content_id = utils.get_id(content_id)
-        if content_id not in self.content:
-            return None
-        return self.module_index.get(self.content[content_id], None)
-
-    def update_data(self, course, answers):
+        return self._get_module(self.content_modules, content_id)
+
+    @staticmethod
+    def _get_module(modules, item_id):
+        module = modules.get(item_id)
+        if module is None:
+            module = modules.get(utils.get_id(item_id))
+            if module is not None:
+                modules[item_id] = module
+        return module
+
+    def _build_index(self):
+        for (modules, items) in ((self.task_modules, self.tasks),
+                                 (self.content_modules, self.content)):
+            modules.clear()
+            for (item_id, module_id) in items.items():
+                module = self.module_index.get(module_id)
+                if module is not None:
+                    modules[item_id] = module
+
+    def update_course(self, course):
         for (content_id, module_id) in course.content.items():
             if 'type@problem' in content_id:
                 self.add_task(module_id, content_id, False)
@@ -122,21 +318,30 @@ class Modules(BaseModel):
         else:
             for moduleid in used:
                 self._add_to_index(moduleid, '')
+        self._build_index()
 
     def _add_to_index(self, moduleid, name):
         self.module_index[moduleid] = (
             moduleid, len(self.module_index) + 1, name or 'NA')
 
+    def merge(self, other):
+        update_nonempty(self.tasks, other.tasks)
+        update_nonempty(self.content, other.content)
+
 
 class Content(BaseModel):
     def __init__(self):
-        self.content = collections.defaultdict(set)
+        self.content = collections.defaultdict(dict)
 
     def add_content(self, content_type, content_id):
-        self.content[content_type].add(content_id)
+        self.content[content_type][content_id] = None
 
-    def update_data(self, course, answers):
+    def update_course(self, course):
         for (content_id, _) in course.content.items():
             item_id = utils.get_id(content_id)
             if 'type@video' in content_id:
                 self.add_content('video', item_id)
+
+    def merge(self, other):
+        for (content_type, content) in other.content.items():
+            self.content[content_type].update(content)
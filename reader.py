@@ -0,0 +1,355 @@
+import bz2
+import collections
+import glob
+import gzip
+import io
+import json
+import logging
+import lzma
+import mmap
+import os
+import queue
+import re
+import stat
+import threading
+
+
+__all__ = ['LogFiles', 'open_log', 'is_compressed', 'expand_logs',
+           'iter_blocks', 'is_ascii_compatible']
+
+
+BUFFER_SIZE = 1 << 20
+
+COMPRESSION = [
+    (b'\x1f\x8b', gzip.GzipFile),
+    (b'BZh', bz2.BZ2File),
+    (b'\xfd7zXZ\x00', lzma.LZMAFile),
+]
+
+
+def is_regular(filename):
+    return stat.S_ISREG(os.stat(filename).st_mode)
+
+
+def get_decompressor(filename):
+    if not is_regular(filename):
+        return None
+    with open(filename, 'rb') as file:
+        magic = file.read(6)
+    for (prefix, decompressor) in COMPRESSION:
+        if magic.startswith(prefix):
+            return decompressor
+    return None
+
+
+def is_compressed(filename):
+    return get_decompressor(filename) is not None
+
+
+class ThreadedReader(io.RawIOBase):
+    def __init__(self, file, buffer_size=BUFFER_SIZE, chunks=4):
+        self._file = file
+        self._buffer_size = buffer_size
+        self._queue = queue.Queue(chunks)
+        self._chunk = memoryview(b'')
+        self._eof = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._read, daemon=True)
+        self._thread.start()
+
+    def _read(self):
+        while not self._stop.is_set():
+            try:
+                chunk = self._file.read(self._buffer_size)
+            except Exception as e:
+                chunk = e
+            self._put(chunk)
+            if not chunk or isinstance(chunk, Exception):
+                return
+
+    def _put(self, chunk):
+        while not self._stop.is_set():
+            try:
+                self._queue.put(chunk, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if not self._chunk and not self._eof:
+            chunk = self._queue.get()
+            if isinstance(chunk, Exception):
+                self._eof = True
+                raise chunk
+            self._eof = not chunk
+            self._chunk = memoryview(chunk)
+        size = min(len(buffer), len(self._chunk))
+        buffer[:size] = self._chunk[:size]
+        self._chunk = self._chunk[size:]
+        return size
+
+    def close(self):
+        if not self.closed:
+            self._stop.set()
+            self._thread.join()
+            self._file.close()
+        super().close()
+
+
+def open_log(filename, encoding, buffer_size=BUFFER_SIZE, threaded=True):
+    decompressor = get_decompressor(filename)
+    if decompressor is None:
+        return open(filename, encoding=encoding, buffering=buffer_size)
+
+    raw = decompressor(filename, 'rb')
+    if threaded:
+        raw = ThreadedReader(raw, buffer_size)
+    return io.TextIOWrapper(
+        io.BufferedReader(raw, buffer_size), encoding=encoding)
+
+
+def open_binary(filename, buffer_size=BUFFER_SIZE, threaded=False):
+    decompressor = get_decompressor(filename)
+    if decompressor is None:
+        return open(filename, 'rb', buffering=buffer_size)
+
+    raw = decompressor(filename, 'rb')
+    if threaded:
+        raw = ThreadedReader(raw, buffer_size)
+    return io.BufferedReader(raw, buffer_size)
+
+
+def is_ascii_compatible(encoding):
+    sample = '{"event_type": "\\"}\n'
+    try:
+        return sample.encode(encoding) == sample.encode('ascii')
+    except (LookupError, UnicodeError):
+        return False
+
+
+def map_log(filename):
+    with open(filename, 'rb') as file:
+        if not os.fstat(file.fileno()).st_size:
+            return None
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def complete_lines_end(filename, start, end):
+    if start >= end:
+        return end
+    mapped = map_log(filename)
+    try:
+        return mapped.rfind(b'\n', start, end) + 1 or start
+    finally:
+        mapped.close()
+
+
+def split_log(filename, parts, start=0, end=None):
+    if end is None:
+        end = os.path.getsize(filename)
+    bounds = [start]
+    mapped = map_log(filename) if parts > 1 else None
+    try:
+        for i in range(1, parts):
+            offset = max(start + (end - start) * i // parts, bounds[-1])
+            if offset >= end:
+                break
+            offset = mapped.find(b'\n', max(offset - 1, 0), end) + 1
+            bounds.append(offset or end)
+    finally:
+        if mapped is not None:
+            mapped.close()
+    bounds.append(end)
+    return [(start, end) for (start, end) in zip(bounds, bounds[1:])
+            if start < end]
+
+
+def read_lines(filename, encoding, start=0, end=None,
+               buffer_size=BUFFER_SIZE):
+    with open_binary(filename, buffer_size) as file:
+        if start:
+            file.seek(start)
+        while end is None or start < end:
+            line = file.readline()
+            if not line:
+                break
+            start += len(line)
+            yield line.decode(encoding)
+
+
+def read_chunks(file, buffer_size, size=None):
+    while size is None or size > 0:
+        chunk = file.read(
+            buffer_size if size is None else min(buffer_size, size))
+        if not chunk:
+            return
+        if size is not None:
+            size -= len(chunk)
+        yield chunk
+
+
+def split_blocks(chunks):
+    tail = b''
+    for chunk in chunks:
+        end = chunk.rfind(b'\n') + 1
+        if not end:
+            tail += chunk
+            continue
+        yield tail + chunk[:end]
+        tail = chunk[end:]
+    if tail:
+        yield tail
+
+
+def map_blocks(mapped, start, end, block_size):
+    while start < end:
+        stop = mapped.find(b'\n', min(start + block_size, end) - 1, end) + 1
+        if not stop:
+            stop = end
+        yield mapped[start:stop]
+        start = stop
+
+
+def iter_blocks(filename, start=0, end=None, buffer_size=BUFFER_SIZE,
+                threaded=False, use_mmap=True):
+    if use_mmap and is_regular(filename) and not is_compressed(filename):
+        mapped = map_log(filename)
+        if mapped is None:
+            return
+        with mapped:
+            yield from map_blocks(
+                mapped, start, len(mapped) if end is None else end,
+                buffer_size)
+        return
+
+    with open_binary(filename, buffer_size, threaded) as file:
+        if start:
+            file.seek(start)
+        size = None if end is None else end - start
+        yield from split_blocks(read_chunks(file, buffer_size, size))
+
+
+def expand_logs(patterns):
+    filenames = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for (root, dirs, files) in os.walk(pattern):
+                dirs.sort()
+                filenames.extend(
+                    os.path.join(root, name) for name in sorted(files))
+        elif glob.has_magic(pattern):
+            filenames.extend(
+                sorted(filter(os.path.isfile, glob.glob(pattern))))
+        else:
+            filenames.append(pattern)
+    return list(collections.OrderedDict.fromkeys(filenames))
+
+
+def first_timestamp(filename, encoding, lines=100):
+    if not is_regular(filename):
+        return None
+    with open_log(filename, encoding, threaded=False) as file:
+        for (_, line) in zip(range(lines), file):
+            try:
+                time = json.loads(re.findall(r'.*?({.*})', line)[-1])['time']
+            except Exception:
+                continue
+            if isinstance(time, str) and time:
+                return time
+    return None
+
+
+def sort_logs(filenames, encoding):
+    timestamps = [
+        first_timestamp(filename, encoding) for filename in filenames]
+    order = sorted(
+        range(len(filenames)),
+        key=lambda i: (timestamps[i] is None, timestamps[i] or ''))
+    return [filenames[i] for i in order]
+
+
+class LogFiles:
+    def __init__(self, patterns, encoding, buffer_size=BUFFER_SIZE, *,
+                 sort=True, offsets=None, use_mmap=True):
+        if isinstance(patterns, str):
+            patterns = [patterns]
+        self.filenames = expand_logs(patterns)
+        if not self.filenames:
+            raise FileNotFoundError(
+                'No log files found: {}'.format(', '.join(patterns)))
+        if sort and len(self.filenames) > 1:
+            self.filenames = sort_logs(self.filenames, encoding)
+        self.encoding = encoding
+        self.buffer_size = buffer_size
+        self.use_mmap = use_mmap
+        self.sizes = collections.OrderedDict(
+            (os.path.abspath(filename), os.path.getsize(filename))
+            for filename in self.filenames if is_regular(filename))
+        if offsets is not None:
+            if not is_ascii_compatible(encoding):
+                raise ValueError(
+                    'Incremental parsing requires an ASCII-compatible '
+                    'encoding, not {}'.format(encoding))
+            for filename in self.filenames:
+                if not is_regular(filename):
+                    raise ValueError(
+                        'Log file {} is not a regular file and cannot be '
+                        'parsed incrementally'.format(filename))
+            for (path, size) in self.sizes.items():
+                if not is_compressed(path):
+                    self.sizes[path] = complete_lines_end(
+                        path, offsets.get(path, 0), size)
+        self.offsets = offsets or {}
+
+    def ranges(self):
+        seekable = is_ascii_compatible(self.encoding)
+        for filename in self.filenames:
+            path = os.path.abspath(filename)
+            if not seekable or path not in self.sizes:
+                yield (filename, 0, None)
+                continue
+            (start, end) = (self.offsets.get(path, 0), self.sizes[path])
+            if is_compressed(filename):
+                if path not in self.offsets:
+                    yield (filename, 0, None)
+                elif start != end:
+                    logging.warning(
+                        'Compressed log file %s has changed since it was '
+                        'parsed. Skip', filename)
+            elif start > end:
+                raise ValueError(
+                    'Log file {} is shorter than the parsed part'.format(
+                        filename))
+            elif start < end:
+                yield (filename, start, end)
+
+    def __iter__(self):
+        for (filename, start, end) in self.ranges():
+            if end is None:
+                with open_log(
+                        filename, self.encoding, self.buffer_size) as file:
+                    yield from file
+            else:
+                yield from read_lines(
+                    filename, self.encoding, start, end, self.buffer_size)
+
+    def iter_blocks(self):
+        for (filename, start, end) in self.ranges():
+            yield from iter_blocks(
+                filename, start, end, self.buffer_size, threaded=end is None,
+                use_mmap=self.use_mmap)
+
+    def shards(self, parts):
+        parts = max(1, parts // len(self.filenames))
+        shards = []
+        for (filename, start, end) in self.ranges():
+            if end is None:
+                shards.append((filename, self.encoding, 0, None))
+            else:
+                shards.extend(
+                    (filename, self.encoding, start, end)
+                    for (start, end) in split_log(filename, parts, start, end))
+        return shards
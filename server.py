@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+
+import argparse
+import collections
+import io
+import json
+import logging
+import os
+import signal
+import socketserver
+import stat
+import sys
+import time
+
+import converter  # loaded once here so that every job starts warm
+import main
+
+
+class JobArgumentParser(argparse.ArgumentParser):
+    def error(self, message):
+        raise ValueError(message)
+
+    def exit(self, status=0, message=None):
+        raise ValueError(message or 'Exit requested with status {}'.format(
+            status))
+
+    def print_help(self, file=None):
+        raise ValueError(self.format_help())
+
+    def print_usage(self, file=None):
+        raise ValueError(self.format_usage())
+
+
+def run_job(line):
+    job_id = None
+    start = time.perf_counter()
+    try:
+        job = json.loads(line)
+        if not isinstance(job, dict):
+            raise ValueError('Job must be a JSON object')
+        job_id = job.get('id')
+        args = job.get('args')
+        if not isinstance(args, list):
+            raise ValueError('Job must have an "args" list')
+
+        params = main.get_parser(JobArgumentParser).parse_args(
+            list(map(str, args)))
+        stats = main.run(params)
+        if params.stats != '-':
+            main.write_stats(stats, params.stats)
+    except Exception as e:
+        logging.error('Job %s failed: %s', job_id, e)
+        return collections.OrderedDict([
+            ('id', job_id), ('status', 'error'), ('error', str(e)),
+            ('seconds', time.perf_counter() - start)])
+
+    response = collections.OrderedDict([
+        ('id', job_id), ('status', 'ok'),
+        ('seconds', time.perf_counter() - start)])
+    if stats is not None:
+        response['stats'] = stats
+    return response
+
+
+def serve_lines(lines, output):
+    for line in lines:
+        if line.strip():
+            output.write(json.dumps(run_job(line)) + '\n')
+            output.flush()
+
+
+class JobHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        output = io.TextIOWrapper(self.wfile, encoding='utf8')
+        try:
+            serve_lines(io.TextIOWrapper(self.rfile, encoding='utf8'), output)
+        finally:
+            output.detach()
+
+
+def serve_socket(path):
+    if os.path.exists(path):
+        if not stat.S_ISSOCK(os.stat(path).st_mode):
+            raise ValueError('{} exists and is not a socket'.format(path))
+        os.unlink(path)
+
+    server = socketserver.UnixStreamServer(path, JobHandler)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        logging.info('Listening on %s', path)
+        server.serve_forever()
+    finally:
+        server.server_close()
+        os.unlink(path)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Run conversion jobs in a single long-lived process. '
+                    'Each job is a JSON line {"id": ..., "args": [...]} '
+                    'with the arguments of main.py; a JSON line with the '
+                    'job status is written back for each job')
+    parser.add_argument(
+        '-s', '--socket', type=str, metavar='PATH',
+        help='Accept jobs on a Unix socket at PATH instead of stdin')
+    parser.add_argument(
+        '-v', '--verbose', action='store_true',
+        help='Report progress and timings')
+    return parser.parse_args()
+
+
+def run():
+    params = parse_args()
+    if params.verbose:
+        logging.basicConfig(level=logging.INFO)
+
+    if params.socket:
+        serve_socket(params.socket)
+    else:
+        serve_lines(sys.stdin, sys.stdout)
+
+
+if __name__ == '__main__':
+    try:
+        sys.exit(run())
+    except KeyboardInterrupt:
+        sys.exit(0)
+    except Exception as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
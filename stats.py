@@ -0,0 +1,132 @@
+import collections
+import contextlib
+import sys
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+__all__ = ['Stats', 'measure', 'profiling']
+
+
+def cpu_time():
+    if resource is None:
+        return time.process_time()
+    return sum(
+        usage.ru_utime + usage.ru_stime
+        for usage in (resource.getrusage(resource.RUSAGE_SELF),
+                      resource.getrusage(resource.RUSAGE_CHILDREN)))
+
+
+def peak_memory():
+    if resource is None:
+        return None
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return collections.OrderedDict(
+        (name, resource.getrusage(who).ru_maxrss * scale)
+        for (name, who) in (('self', resource.RUSAGE_SELF),
+                            ('children', resource.RUSAGE_CHILDREN)))
+
+
+def add_stage(stages, name, wall, cpu=None):
+    stage = stages.setdefault(name, [0.0, None])
+    stage[0] += wall
+    if cpu is not None:
+        stage[1] = (stage[1] or 0.0) + cpu
+
+
+def format_stages(stages):
+    return collections.OrderedDict(
+        (name, collections.OrderedDict(
+            [('wall', wall)] + ([] if cpu is None else [('cpu', cpu)])))
+        for (name, (wall, cpu)) in stages.items())
+
+
+class Stats:
+    def __init__(self):
+        self.stages = collections.OrderedDict()
+        self.workers = collections.OrderedDict()
+        self.handlers = collections.Counter()
+        self.errors = 0
+        self.lines = 0
+        self.events = 0
+        self.skipped = 0
+
+    def add(self, name, wall, cpu=None):
+        add_stage(self.stages, name, wall, cpu)
+
+    def add_worker(self, name, wall, cpu=None):
+        add_stage(self.workers, name, wall, cpu)
+
+    def wall(self, name):
+        return self.stages.get(name, (0.0, None))[0]
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        (wall, cpu) = (time.perf_counter(), cpu_time())
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - wall, cpu_time() - cpu)
+
+    def iterate(self, name, iterable):
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self.add(name, time.perf_counter() - start)
+            yield item
+
+    def count_lines(self, parser):
+        self.lines = parser.lines
+        self.events = parser.lines_decoded
+        self.skipped = parser.lines_skipped
+
+    def merge(self, other):
+        for (name, (wall, cpu)) in other.stages.items():
+            self.add_worker(name, wall, cpu)
+        self.handlers.update(other.handlers)
+        self.errors += other.errors
+
+    def as_dict(self):
+        parse = self.wall('parse')
+        return collections.OrderedDict([
+            ('stages', format_stages(self.stages)),
+            ('workers', format_stages(self.workers)),
+            ('lines', self.lines),
+            ('events', self.events),
+            ('skipped', self.skipped),
+            ('events_per_second', self.events / parse if parse else None),
+            ('errors', self.errors),
+            ('handlers', collections.OrderedDict(
+                sorted(self.handlers.items(), key=lambda item: -item[1]))),
+            ('peak_memory', peak_memory()),
+        ])
+
+
+def measure(stats, name):
+    if stats is None:
+        return contextlib.ExitStack()
+    return stats.stage(name)
+
+
+@contextlib.contextmanager
+def profiling(filename):
+    if not filename:
+        yield
+        return
+    import cProfile
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(filename)
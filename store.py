@@ -0,0 +1,358 @@
+import collections.abc
+import os
+import sqlite3
+import tempfile
+
+import models
+import utils
+
+
+__all__ = ['Store', 'DiskUsers', 'DiskTasks', 'DiskModules']
+
+
+BATCH_SIZE = 10000
+CACHE_SIZE = 64 << 10
+
+
+class Store:
+    def __init__(self, directory=None, batch_size=BATCH_SIZE):
+        (fd, self.filename) = tempfile.mkstemp(
+            suffix='.sqlite', prefix='edx_converter_', dir=directory)
+        os.close(fd)
+        self.batch_size = batch_size
+        self._tables = []
+        self._pid = None
+        self._connection = None
+
+    @property
+    def connection(self):
+        if self._pid != os.getpid():
+            self._connection = sqlite3.connect(
+                self.filename, check_same_thread=False)
+            self._pid = os.getpid()
+            for pragma in ('journal_mode = OFF', 'synchronous = OFF',
+                           'temp_store = FILE',
+                           'cache_size = -{}'.format(CACHE_SIZE)):
+                self._connection.execute('PRAGMA ' + pragma)
+        return self._connection
+
+    def create(self, name, columns, *indexes):
+        self.connection.execute('CREATE TABLE {} ({})'.format(
+            name, ', '.join(columns)))
+        for (i, (unique, index)) in enumerate(indexes):
+            self.connection.execute('CREATE {}INDEX {}_{} ON {} ({})'.format(
+                'UNIQUE ' if unique else '', name, i, name, ', '.join(index)))
+
+    def register(self, table):
+        self._tables.append(table)
+
+    def dict(self, name, keys=1, values=1, *, nonempty=False):
+        cls = NonEmptyStoreDict if nonempty else StoreDict
+        return cls(self, name, keys, values)
+
+    def groups(self, name, values=1, *, unique=False):
+        return StoreGroups(self, name, values, unique)
+
+    def flush(self):
+        for table in self._tables:
+            table.flush()
+        self.connection.commit()
+
+    def close(self):
+        if self._connection is not None and self._pid == os.getpid():
+            self._connection.close()
+        (self._connection, self._pid) = (None, None)
+        if os.path.exists(self.filename):
+            os.remove(self.filename)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def columns(prefix, count):
+    return ['{}{}'.format(prefix, i) for i in range(count)]
+
+
+def pack(value, count):
+    return tuple(value) if count > 1 else (value,)
+
+
+def unpack(row):
+    return row if len(row) > 1 else row[0]
+
+
+class StoreDict(collections.abc.MutableMapping):
+    def __init__(self, store, name, keys=1, values=1):
+        self._store = store
+        self._name = name
+        self._keys = columns('k', keys)
+        self._values = columns('v', values)
+        self._pending = {}
+        store.create(name, self._keys + self._values, (True, self._keys))
+        store.register(self)
+
+        self._where = ' AND '.join(key + ' = ?' for key in self._keys)
+        self._insert = (
+            'INSERT INTO {0} VALUES ({1}) ON CONFLICT ({2}) '
+            'DO UPDATE SET {3}'.format(
+                name, ', '.join('?' * (keys + values)), ', '.join(self._keys),
+                ', '.join('{0} = excluded.{0}'.format(value)
+                          for value in self._values)))
+
+    def _select(self, columns):
+        return self._store.connection.execute(
+            'SELECT {} FROM {} ORDER BY rowid'.format(
+                ', '.join(columns), self._name))
+
+    def flush(self):
+        if self._pending:
+            self._store.connection.executemany(self._insert, (
+                pack(key, len(self._keys)) + pack(value, len(self._values))
+                for (key, value) in self._pending.items()))
+            self._pending.clear()
+
+    def __getitem__(self, key):
+        if key in self._pending:
+            return self._pending[key]
+        row = self._store.connection.execute(
+            'SELECT {} FROM {} WHERE {}'.format(
+                ', '.join(self._values), self._name, self._where),
+            pack(key, len(self._keys))).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return unpack(row)
+
+    def __setitem__(self, key, value):
+        self._pending[key] = value
+        if len(self._pending) >= self._store.batch_size:
+            self.flush()
+
+    def __delitem__(self, key):
+        self.flush()
+        cursor = self._store.connection.execute(
+            'DELETE FROM {} WHERE {}'.format(self._name, self._where),
+            pack(key, len(self._keys)))
+        if not cursor.rowcount:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        self.flush()
+        for row in self._select(self._keys):
+            yield unpack(row)
+
+    def __len__(self):
+        self.flush()
+        return self._store.connection.execute(
+            'SELECT COUNT(*) FROM {}'.format(self._name)).fetchone()[0]
+
+    def items(self):
+        self.flush()
+        for row in self._select(self._keys + self._values):
+            yield (unpack(row[:len(self._keys)]),
+                   unpack(row[len(self._keys):]))
+
+    def values(self):
+        self.flush()
+        for row in self._select(self._values):
+            yield unpack(row)
+
+
+class NonEmptyStoreDict(utils.NonEmptyMixin, StoreDict):
+    pass
+
+
+class StoreGroups:
+    def __init__(self, store, name, values=1, unique=False):
+        self._store = store
+        self._name = name
+        self._values = columns('v', values)
+        self._pending = []
+        store.create(
+            name, ['k'] + self._values,
+            (unique, ['k'] + self._values) if unique else (False, ['k']))
+        store.register(self)
+
+        self._insert = 'INSERT {}INTO {} VALUES ({})'.format(
+            'OR IGNORE ' if unique else '', name,
+            ', '.join('?' * (values + 1)))
+
+    def flush(self):
+        if self._pending:
+            self._store.connection.executemany(self._insert, self._pending)
+            self._pending.clear()
+
+    def add(self, key, value):
+        self._pending.append((key,) + pack(value, len(self._values)))
+        if len(self._pending) >= self._store.batch_size:
+            self.flush()
+
+    def select(self, key, values=None):
+        self.flush()
+        values = tuple(values or ())
+        where = ' AND '.join(
+            column + ' = ?' for column in ['k'] + self._values[:len(values)])
+        return self._store.connection.execute(
+            'SELECT {} FROM {} WHERE {} ORDER BY rowid'.format(
+                ', '.join(self._values), self._name, where),
+            (key,) + values)
+
+    def __getitem__(self, key):
+        return StoreGroup(self, key)
+
+    def __contains__(self, key):
+        return self.select(key).fetchone() is not None
+
+    def __iter__(self):
+        self.flush()
+        for (key,) in self._store.connection.execute(
+                'SELECT k FROM {} GROUP BY k ORDER BY MIN(rowid)'.format(
+                    self._name)):
+            yield key
+
+    def items(self):
+        for key in self:
+            yield (key, self[key])
+
+
+class StoreGroup:
+    def __init__(self, groups, key):
+        self._groups = groups
+        self._key = key
+
+    def add(self, value):
+        self._groups.add(self._key, value)
+
+    def __setitem__(self, value, _):
+        self.add(value)
+
+    append = add
+
+    def update(self, values):
+        for value in values:
+            self.add(value)
+
+    extend = update
+
+    def __contains__(self, value):
+        cursor = self._groups.select(
+            self._key, pack(value, len(self._groups._values)))
+        return cursor.fetchone() is not None
+
+    def __iter__(self):
+        for row in self._groups.select(self._key):
+            yield unpack(row)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+class StoreAttempts:
+    ITERATE = (
+        'SELECT a.user, a.subtask, a.time, a.correct FROM attempts AS a '
+        'JOIN (SELECT user, MIN(rowid) AS first FROM attempts GROUP BY user) '
+        'AS u USING (user) '
+        'JOIN (SELECT user, subtask, MIN(rowid) AS first FROM attempts '
+        'GROUP BY user, subtask) AS s USING (user, subtask) '
+        'ORDER BY u.first, s.first, a.rowid')
+
+    def __init__(self, store):
+        self._store = store
+        self._pending = []
+        store.create(
+            'attempts', ['user', 'subtask', 'time', 'correct'],
+            (False, ['user', 'subtask']))
+        store.register(self)
+
+    def flush(self):
+        if self._pending:
+            self._store.connection.executemany(
+                'INSERT INTO attempts VALUES (?, ?, ?, ?)', self._pending)
+            self._pending.clear()
+
+    def add(self, user, subtask, time, correct):
+        self._pending.append((user, subtask, time, int(correct)))
+        if len(self._pending) >= self._store.batch_size:
+            self.flush()
+
+    def keys(self):
+        return AttemptKeys(self)
+
+    def __contains__(self, key):
+        self.flush()
+        return self._store.connection.execute(
+            'SELECT 1 FROM attempts WHERE user = ? AND subtask = ? LIMIT 1',
+            key).fetchone() is not None
+
+    def __len__(self):
+        self.flush()
+        return self._store.connection.execute(
+            'SELECT COUNT(*) FROM attempts').fetchone()[0]
+
+    def __iter__(self):
+        self.flush()
+        yield from self._store.connection.execute(self.ITERATE)
+
+    def merge(self, other, codes, resolved):
+        for (i, (user, subtask)) in enumerate(
+                zip(other.users, other.subtasks)):
+            time = resolved[i] if i in resolved else other.get_time(i)
+            self.add(codes[user], codes[subtask], time, other.get_correct(i))
+
+
+class AttemptKeys:
+    def __init__(self, attempts):
+        self._attempts = attempts
+
+    def __contains__(self, key):
+        return key in self._attempts
+
+    def add(self, key):
+        pass
+
+
+class Identity:
+    def __call__(self, name):
+        return name
+
+    def get(self, name):
+        return name
+
+    def __getitem__(self, code):
+        return code
+
+
+class DiskUsers(models.Users):
+    def __init__(self, store):
+        self.ids = Identity()
+        self.times = store.dict('times', keys=2)
+        self.attempts = StoreAttempts(store)
+        self.pr_submits = store.dict('pr_submits', values=2)
+        self.assessments = store.groups('assessments', values=3)
+        self.viewed_content = store.groups('viewed_content', unique=True)
+
+
+class DiskTasks(models.Tasks):
+    def __init__(self, store):
+        self.tasks = store.groups('tasks', unique=True)
+        self.subtask_text = store.dict('subtask_text', nonempty=True)
+        self.subtask_type = store.dict('subtask_type', nonempty=True)
+        self.assessments = store.dict('task_assessments', nonempty=True)
+
+
+class DiskModules(models.Modules):
+    def __init__(self, store):
+        self.tasks = store.dict('module_tasks', nonempty=True)
+        self.content = store.dict('module_content', nonempty=True)
+        self.module_index = {}
+        self.task_modules = {}
+        self.content_modules = {}
@@ -1,3 +1,5 @@
+import os
+import tempfile
 import unittest
 
 import answers as t
@@ -14,7 +16,7 @@ class AnswersParserTest(unittest.TestCase):
     def test_parser(self):
         answers = t.AnswersParser(self.DATA)
         self.assertListEqual(
-            answers.answers,
+            list(answers.answers),
             [('type@problem+block@aa', 'aa_1', 'Вопрос', '1234',
               '2018.03.03T11:00:00', '0'),
              ('type@problem+block@aa', 'aa_1', 'Вопрос', '1234',
@@ -23,3 +25,44 @@ class AnswersParserTest(unittest.TestCase):
               '2018.03.03T12:10:00', '0'),
              ('type@problem+block@bb', 'bb_1', 'XXX', '2345',
               '2018.03.04T12:00:00', '1')])
+
+    def test_select(self):
+        answers = t.AnswersParser(self.DATA + [
+            '5;course-v1:a+b+c;block-v1:x+y+z+type@problem+block@cc;cc_1;'
+            '1;u;2018.03.03T11:00:00;0;NULL;a;1;Q;2018.03.03T13:00:00'])
+        self.assertListEqual(
+            [answer[1] for answer in answers.select('course-fall').answers],
+            ['aa_1', 'aa_1', 'aa_2', 'bb_1'])
+        self.assertListEqual(
+            [answer[1] for answer in answers.select('a+b+c').answers],
+            ['cc_1'])
+        self.assertListEqual(
+            [answer[1] for answer in answers.select('x+y+z').answers],
+            ['cc_1'])
+        self.assertListEqual(list(answers.select('d+e+f').answers), [])
+
+    def test_file(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, 'answers')
+            with open(filename, 'w', encoding='cp1251') as file:
+                file.write('\n'.join(self.DATA + ['invalid']))
+
+            answers = t.AnswersParser(t.AnswersFile(filename, 'cp1251'))
+            with self.assertLogs(level='WARNING') as logs:
+                first = list(answers.answers)
+                self.assertListEqual(list(answers.answers), first)
+                self.assertListEqual(
+                    list(answers.select('course-fall').answers), first)
+            self.assertEqual(len(logs.output), 1)
+            self.assertListEqual(
+                first, list(t.AnswersParser(self.DATA).answers))
+
+            with open(filename, encoding='cp1251') as file:
+                answers = t.AnswersParser(file)
+            with self.assertLogs(level='WARNING') as logs:
+                self.assertListEqual(list(answers.answers), first)
+                self.assertListEqual(list(answers.answers), first)
+            self.assertEqual(len(logs.output), 1)
+
+            with self.assertRaises(FileNotFoundError):
+                t.AnswersFile(os.path.join(tmpdir, 'missing'), 'cp1251')
@@ -0,0 +1,96 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+from reader import LogFiles
+from . import parser_test
+from .utils import parse_log
+import checkpoint as t
+
+
+class CheckpointTest(unittest.TestCase):
+    LOG = parser_test.LogsTest.LOG
+
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.tmpdir = self._tmpdir.name
+        self.logname = os.path.join(self.tmpdir, 'log')
+        self.state = os.path.join(self.tmpdir, 'state')
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _parse_incremental(self, workers=1):
+        checkpoint = t.Checkpoint(self.state)
+        logs = LogFiles(self.tmpdir + '/log*', 'utf8',
+                        offsets=checkpoint.offsets)
+        return parse_log(logs, workers=workers, checkpoint=checkpoint)
+
+    def _append(self, lines, opener=open, filename=None):
+        with opener(filename or self.logname, 'at', encoding='utf8') as file:
+            file.writelines(line + '\n' for line in lines)
+
+    def assertReportEqual(self, first, second):
+        self.assertEqual(first.course_name, second.course_name)
+        self.assertEqual(first.lines, second.lines)
+        self.assertListEqual(
+            list(first.get_student_solutions()),
+            list(second.get_student_solutions()))
+        for getter in ('get_tasks', 'get_student_content', 'get_content',
+                       'get_assessments'):
+            self.assertListEqual(
+                list(getattr(first, getter)()),
+                list(getattr(second, getter)()))
+
+    def test_incremental(self):
+        self._append(self.LOG[:3])
+        self.assertEqual(self._parse_incremental().lines, 3)
+
+        self._append(self.LOG[3:])
+        serial = parse_log(self.LOG)
+        self.assertReportEqual(self._parse_incremental(), serial)
+        self.assertReportEqual(self._parse_incremental(), serial)
+
+    def test_incremental_parallel(self):
+        self._append(self.LOG[:5])
+        self._parse_incremental(workers=2)
+        self._append(self.LOG[5:])
+        self.assertReportEqual(
+            self._parse_incremental(workers=3), parse_log(self.LOG))
+
+    def test_new_files(self):
+        self._append(self.LOG[:4])
+        self._parse_incremental()
+        self._append(self.LOG[4:6], gzip.open, self.logname + '2.gz')
+        self._parse_incremental()
+        self._append(self.LOG[6:], filename=self.logname + '3')
+        report = self._parse_incremental()
+
+        self.assertReportEqual(report, parse_log(self.LOG))
+        self.assertEqual(report.lines_decoded, len(self.LOG))
+
+    def test_encoding(self):
+        self._append(self.LOG)
+        with self.assertRaises(ValueError):
+            LogFiles(self.logname, 'utf-16', offsets={})
+
+    def test_partial_line(self):
+        self._append(self.LOG[:3])
+        with open(self.logname, 'a', encoding='utf8') as file:
+            file.write(self.LOG[3][:20])
+        self.assertEqual(self._parse_incremental().lines, 3)
+
+        with open(self.logname, 'a', encoding='utf8') as file:
+            file.write(self.LOG[3][20:] + '\n')
+        self._append(self.LOG[4:])
+        report = self._parse_incremental()
+        self.assertReportEqual(report, parse_log(self.LOG))
+        self.assertEqual(report.lines_decoded, len(self.LOG))
+
+    def test_truncated(self):
+        self._append(self.LOG)
+        self._parse_incremental()
+        os.truncate(self.logname, 10)
+        with self.assertRaises(ValueError):
+            self._parse_incremental()
@@ -0,0 +1,70 @@
+import argparse
+import json
+import os
+import tempfile
+import unittest
+
+from benchmarks import synthetic
+import converter as t
+
+
+class ConvertTest(unittest.TestCase):
+    FILES = ['csv1.csv', 'csv2.csv', 'csv3.csv', 'csv4.csv', 'csv5.csv',
+             'course.json']
+
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.tmpdir = self._tmpdir.name
+        parser = argparse.ArgumentParser()
+        synthetic.add_arguments(parser)
+        self.paths = synthetic.generate(
+            os.path.join(self.tmpdir, 'data'), parser.parse_args(
+                ['-n', '5000', '--users', '50', '--problems', '60',
+                 '--answers', '500']))
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def convert(self, name, **kwargs):
+        output = os.path.join(self.tmpdir, name)
+        os.mkdir(output)
+        with self.assertLogs(level='WARNING'):
+            t.convert(
+                self.paths['course'], self.paths['answers'],
+                self.paths['courses'], self.paths['log'], 'utf8',
+                os.path.join(output, 'csv'), **kwargs)
+        files = []
+        for name in self.FILES:
+            with open(os.path.join(output, name), 'rb') as file:
+                files.append(file.read())
+        return files
+
+    def test_workers(self):
+        serial = self.convert('serial')
+        for (name, kwargs) in (
+                ('parallel', {'workers': 3}),
+                ('pipeline', {'workers': 3, 'pipeline': True}),
+                ('spill', {'workers': 3, 'spill': self.tmpdir})):
+            self.assertListEqual(self.convert(name, **kwargs), serial, name)
+
+    def test_course_directories(self):
+        self.assertDictEqual(
+            t.get_course_directories(['a+b+c', 'x/y:z', '..', '.']),
+            {'a+b+c': 'a+b+c', 'x/y:z': 'x_y_z', '..': '__', '.': '_'})
+        with self.assertRaises(ValueError):
+            t.get_course_directories(['a/b', 'a_b'])
+
+        output = os.path.join(self.tmpdir, 'courses')
+        os.mkdir(output)
+        log = os.path.join(self.tmpdir, 'log')
+        with open(log, 'w', encoding='utf8') as file:
+            for course_id in ('a/b', 'a_b'):
+                file.write(json.dumps({
+                    'event_type': 'play_video',
+                    'event': json.dumps({'id': 'v1'}),
+                    'context': {'course_id': 'course-v1:' + course_id,
+                                'user_id': 'u1'}}) + '\n')
+        with self.assertRaises(ValueError):
+            t.convert(None, None, None, log, 'utf8',
+                      os.path.join(output, 'csv'), multi_course=True)
+        self.assertListEqual(os.listdir(output), [])
@@ -29,3 +29,12 @@ type@chapter+block@m4;type@sequential+block@s4;type@vertical+block@V1;type@probl
                 'type@video+block@v1': 'm1',
                 'type@video+block@v2': 'm1'
             })
+
+    def test_select(self):
+        courses = t.CourseParser([
+            'type@chapter+block@m1;block-v1:a+b+c+type@video+block@v1;M1',
+            'type@chapter+block@m2;block-v1:d+e+f+type@video+block@v2;M2'])
+        course = courses.select('a+b+c')
+        self.assertDictEqual(
+            course.content, {'block-v1:a+b+c+type@video+block@v1': 'm1'})
+        self.assertListEqual(list(course.modules), ['m1', 'm2'])
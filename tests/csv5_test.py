@@ -0,0 +1,151 @@
+import datetime
+import importlib.util
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from . import parser_test
+from .utils import parse_log
+import csv5 as t
+
+
+class CSVProcessorTest(unittest.TestCase):
+    ROWS = [
+        ('u1', 'p1', 1, '01.01.2018 12:00:00'),
+        ('u1', 'p2', 0, None),
+        ('', 'p1', 1, '01.01.2018 12:00:00'),
+        ('u2', 'p1', 2, ''),
+        ('u2', 'p2', 1, '01.01.2018 12:10:00'),
+        ('u3', 'p1', True, '01.01.2018 12:20:00'),
+        ('u"4', 'p;1', 0, '01.01.2018\n12:30:00'),
+    ]
+
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.prefix = os.path.join(self._tmpdir.name, 'csv')
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _write(self, write):
+        with self.assertLogs(level='WARNING') as logs:
+            with t.CSV1(self.prefix, 'utf8') as processor:
+                write(processor)
+        filename = self.prefix + '1.csv'
+        with open(filename, encoding='utf8', newline='') as file:
+            return (file.read(), logs.output)
+
+    def test_writeiter(self):
+        def write_rows(processor):
+            for row in self.ROWS:
+                processor.write(*row)
+
+        (expected, warnings) = self._write(write_rows)
+        self.assertEqual(expected.split('\r\n'), [
+            'user_id;item_id;correct;time',
+            'u1;p1;1;01.01.2018 12:00:00',
+            'u2;p2;1;01.01.2018 12:10:00',
+            '"u""4";"p;1";0;"01.01.2018\n12:30:00"', ''])
+        self.assertEqual(len(warnings), 4)
+
+        for chunk_size in (1, 2, 3, 100):
+            with mock.patch.object(t, 'CHUNK_SIZE', chunk_size):
+                self.assertTupleEqual(
+                    self._write(lambda p: p.writeiter(iter(self.ROWS))),
+                    (expected, warnings))
+
+
+class ProcessAllTest(unittest.TestCase):
+    FILES = ['csv1.csv', 'csv2.csv', 'csv3.csv', 'csv4.csv', 'csv5.csv',
+             'course.json']
+
+    def test_workers(self):
+        parser = parse_log(parser_test.LogsTest.LOG)
+        outputs = []
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for workers in (1, 3, 8):
+                prefix = os.path.join(tmpdir, str(workers), 'csv')
+                os.mkdir(os.path.dirname(prefix))
+                timings = t.process_all_csvs(
+                    prefix, 'utf8', parser, workers=workers)
+                self.assertListEqual(
+                    list(timings),
+                    [os.path.join(os.path.dirname(prefix), name)
+                     for name in self.FILES])
+
+                output = []
+                for name in self.FILES:
+                    filename = os.path.join(os.path.dirname(prefix), name)
+                    with open(filename, encoding='utf8') as file:
+                        output.append(file.read())
+                outputs.append(output)
+
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertEqual(outputs[0], outputs[2])
+
+
+@unittest.skipUnless(
+    importlib.util.find_spec('pyarrow'), 'pyarrow is not installed')
+class ColumnarTest(unittest.TestCase):
+    def test_formats(self):
+        import pyarrow.ipc
+        import pyarrow.parquet
+
+        readers = {
+            'parquet': pyarrow.parquet.read_table,
+            'arrow': lambda name: pyarrow.ipc.open_file(name).read_all(),
+        }
+        parser = parse_log(parser_test.LogsTest.LOG)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            prefix = os.path.join(tmpdir, 'csv')
+            for (format_, read) in readers.items():
+                t.process_all(prefix, 'utf8', parser, format_, workers=2)
+
+                csv1 = read('{}1.{}'.format(prefix, format_))
+                self.assertEqual(
+                    csv1.column_names,
+                    ['user_id', 'item_id', 'correct', 'time'])
+                self.assertEqual(
+                    str(csv1.schema.field('correct').type), 'int64')
+                self.assertListEqual(csv1.to_pylist(), [
+                    {'user_id': '15', 'item_id': 't1', 'correct': 0,
+                     'time': datetime.datetime(2018, 1, 2, 9, 30)},
+                    {'user_id': '15', 'item_id': 't1', 'correct': 1,
+                     'time': datetime.datetime(2018, 1, 2, 10, 0)}])
+
+                csv5 = read('{}5.{}'.format(prefix, format_))
+                self.assertListEqual(csv5.to_pylist(), [
+                    {'user_id': 'uu', 'item_id': 'bb', 'reviewer_id': 'u2',
+                     'score': 3, 'max_score': 5}])
+
+                course = read(os.path.join(tmpdir, 'course.' + format_))
+                self.assertListEqual(course.to_pylist(), [
+                    {'short_name': '', 'long_name': '', 'roo_course_id': ''}])
+
+    def test_raw_times(self):
+        import pyarrow.parquet
+
+        parser = parse_log([
+            '{"event_type": "problem_check", "event_source": "server", '
+            '"time": "2018-01-02T09:30:00.123+00:00", '
+            '"context": {"user_id": "15"}, "event": {"problem_id": "pp", '
+            '"submission": {"t1": {"question": "Q", "response_type": "type", '
+            '"correct": true}}}}',
+            '{"event_type": "problem_check", "event_source": "server", '
+            '"time": "soon", "context": {"user_id": "16"}, '
+            '"event": {"problem_id": "pp", "submission": {"t1": '
+            '{"question": "Q", "response_type": "type", "correct": false}}}}'])
+        with tempfile.TemporaryDirectory() as tmpdir:
+            prefix = os.path.join(tmpdir, 'csv')
+            with self.assertLogs(level='WARNING') as logs:
+                t.process_all(prefix, 'utf8', parser, 'parquet')
+
+            self.assertEqual(
+                logs.output, ['WARNING:root:Invalid time "soon". Write null'])
+            self.assertListEqual(
+                pyarrow.parquet.read_table(prefix + '1.parquet').to_pylist(),
+                [{'user_id': '15', 'item_id': 't1', 'correct': 1,
+                  'time': datetime.datetime(2018, 1, 2, 9, 30)},
+                 {'user_id': '16', 'item_id': 't1', 'correct': 0,
+                  'time': None}])
@@ -0,0 +1,58 @@
+import json
+import os
+import pickle
+import subprocess
+import sys
+import unittest
+
+import decoder as t
+
+
+def available(name):
+    try:
+        t.get_decoder(name)
+    except RuntimeError:
+        return False
+    return True
+
+
+class DecoderTest(unittest.TestCase):
+    DATA = [
+        '{"event_type": "play_video", "event": "{\\"id\\": \\"v1\\"}"}',
+        '{"a": [1, 2.5, null, true], '
+        '"b": {"c": "\\u0442\\u0435\\u0441\\u0442"}}',
+        '{"nan": NaN, "big": 123456789012345678901234567890}',
+        '{"surrogate": "\\ud800"}',
+        '{"dup": 1, "dup": 2}',
+    ]
+
+    def test_get_decoder(self):
+        self.assertIs(t.get_decoder('json'), json.loads)
+        self.assertTrue(callable(t.get_decoder()))
+        with self.assertRaises(ValueError):
+            t.get_decoder('yaml')
+
+    def test_decoders(self):
+        for name in t.DECODERS:
+            if not available(name):
+                continue
+            loads = t.get_decoder(name)
+            for text in self.DATA:
+                self.assertEqual(
+                    repr(loads(text)), repr(json.loads(text)), (name, text))
+            with self.assertRaises(ValueError):
+                loads('{"broken"')
+
+    def test_lazy_import(self):
+        output = subprocess.check_output(
+            [sys.executable, '-c',
+             'import sys, converter; print(sorted(set(sys.modules) & {}))'
+             .format(set(t.DECODERS[:-1]))],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            universal_newlines=True)
+        self.assertEqual(output.strip(), '[]')
+
+    @unittest.skipUnless(available('orjson'), 'orjson is not installed')
+    def test_pickle(self):
+        loads = pickle.loads(pickle.dumps(t.get_decoder('orjson')))
+        self.assertEqual(loads('{"a": 1}'), {'a': 1})
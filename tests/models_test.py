@@ -5,6 +5,34 @@ from .utils import FakeAnswers, FakeCourse
 import models as t
 
 
+class OnceAnswers:
+    def __init__(self, answers):
+        self._answers = answers
+
+    @property
+    def answers(self):
+        answers = self._answers
+        self._answers = None
+        return iter(answers)
+
+
+class UpdateDataTest(unittest.TestCase):
+    def test_single_pass(self):
+        (users, tasks) = (t.Users(), t.Tasks())
+        users.post_solution('u1', 'p1', '01.01.2018 12:00:00')
+        users.score_task('u1', 'p1', 's11', '1')
+        t.update_data(FakeCourse(), OnceAnswers([
+            ('p1', 's11', 'task 1.1', 'u1', 'invalid time', '0'),
+            ('p1', 's12', 'task 1.2', 'u1', '2018-01-01T12:10:00.0000', '0'),
+        ]), users, tasks, t.Modules(), t.Content())
+
+        self.assertDictEqual(users.get_submits(), {
+            'u1': {'s11': [('01.01.2018 12:00:00', 1)],
+                   's12': [('01.01.2018 12:10:00', 0)]}})
+        self.assertDictEqual(
+            tasks.subtask_text, {'s11': 'task 1.1', 's12': 'task 1.2'})
+
+
 class NormalizersTest(unittest.TestCase):
     def test_normalize_url(self):
         func = t.normalize_module_url
@@ -37,7 +65,7 @@ class UsersTest(unittest.TestCase):
         self.users.score_task('u1', 'p1', 's12', '1')
         self.users.score_task('u1', 'p2', 's21', '1')
 
-        self.assertDictEqual(self.users.submits, {
+        self.assertDictEqual(self.users.get_submits(), {
             'u1': {
                 's11': [('t1', 0), ('t2', 1)],
                 's12': [('t3', 1)],
@@ -45,6 +73,33 @@ class UsersTest(unittest.TestCase):
             }
         })
 
+    def test_attempts_order(self):
+        self.users.score_task('u2', 'p1', 's11', '0', '01.01.2018 12:00:00')
+        self.users.score_task('u1', 'p1', 's12', True, '2018-01-01T12:00:01')
+        self.users.score_task('u2', 'p1', 's12', '1', '01.01.2018 12:00:02')
+        self.users.score_task('u1', 'p1', 's11', False, '01.01.2018 12:00:03')
+        self.users.score_task('u2', 'p1', 's11', '1', '01.01.2018 12:00:04')
+        self.users.score_task('u1', 'p1', 's12', '0', '01.01.2018 12:00:05')
+
+        self.assertListEqual(list(self.users.iter_submits()), [
+            ('u2', 's11', '01.01.2018 12:00:00', 0),
+            ('u2', 's11', '01.01.2018 12:00:04', 1),
+            ('u2', 's12', '01.01.2018 12:00:02', 1),
+            ('u1', 's12', '2018-01-01T12:00:01', 1),
+            ('u1', 's12', '01.01.2018 12:00:05', 0),
+            ('u1', 's11', '01.01.2018 12:00:03', 0),
+        ])
+
+    def test_wide_correct(self):
+        shard = t.ShardUsers()
+        shard.score_task('u1', 'p1', 's11', '-1', 't1')
+        shard.score_task('u1', 'p1', 's11', '300', 't2')
+        shard.score_task('u1', 'p1', 's11', '-129', 't3')
+        self.users.merge(shard)
+
+        self.assertDictEqual(self.users.get_submits(), {
+            'u1': {'s11': [('t1', -1), ('t2', 300), ('t3', -129)]}})
+
     def test_assessments(self):
         self.users.create_submission('s1', '100', 'p1')
         self.users.assess('s1', '123', '1', '12')
@@ -66,7 +121,7 @@ class UsersTest(unittest.TestCase):
         self.users.view_content('u1', 'v1')
         self.users.view_content('u2', 'v3')
 
-        self.assertDictEqual(self.users.viewed_content, {
+        self.assertDictEqual(self.users.get_viewed_content(), {
             'u1': {'v1', 'v2'}, 'u2': {'v1', 'v3'}
         })
 
@@ -79,7 +134,7 @@ class UsersTest(unittest.TestCase):
             ('p1', 's11', '', 'u2', '2018-01-01T12:20:00.0000', '1')
         ]))
 
-        self.assertDictEqual(self.users.submits, {
+        self.assertDictEqual(self.users.get_submits(), {
             'u1': {
                 's11': [('01.01.2018 12:10:00', 0)],
                 's12': [('01.01.2018 12:00:00', 1)]
@@ -87,6 +142,30 @@ class UsersTest(unittest.TestCase):
             'u2': {'s11': [('01.01.2018 12:20:00', 1)]}
         })
 
+    def test_merge(self):
+        shard = t.ShardUsers()
+        shard.score_task('u1', 'p1', 's11', '1', 't0')
+        shard.post_solution('u1', 'p1', 't3')
+        shard.score_task('u1', 'p1', 's11', '0', 't4')
+        shard.score_task('u2', 'p1', 's11', '1', 't5')
+        shard.view_content('u1', 'v2')
+        self.assertListEqual(
+            [(index, shard.ids[problem])
+             for (index, problem) in shard.unresolved],
+            [(0, 'p1'), (2, 'p1')])
+
+        self.users.post_solution('u1', 'p1', 't1')
+        self.users.score_task('u1', 'p1', 's11', '0')
+        self.users.view_content('u1', 'v1')
+        self.users.merge(shard)
+
+        self.assertDictEqual(self.users.get_submits(), {
+            'u1': {'s11': [('t1', 0), ('t1', 1), ('t3', 0)]},
+            'u2': {'s11': [('t5', 1)]}
+        })
+        self.assertDictEqual(
+            self.users.get_viewed_content(), {'u1': {'v1', 'v2'}})
+
 
 class TasksTest(unittest.TestCase):
     def setUp(self):
@@ -101,7 +180,9 @@ class TasksTest(unittest.TestCase):
         self.tasks.add_task('p1', 's12', '', '')
 
         self.assertDictEqual(
-            self.tasks.tasks, {'p1': {'s11', 's12'}, 'p2': {'s21'}})
+            {problem_id: list(subtasks)
+             for (problem_id, subtasks) in self.tasks.tasks.items()},
+            {'p1': ['s11', 's12'], 'p2': ['s21']})
         self.assertDictEqual(
             self.tasks.subtask_text, {
                 's11': 't 1.1', 's12': 't 1.2', 's21': 't 2.1'
@@ -131,7 +212,9 @@ class TasksTest(unittest.TestCase):
         ]))
 
         self.assertDictEqual(
-            self.tasks.tasks, {'p1': {'s11', 's12'}, 'p2': {'s21'}})
+            {problem_id: list(subtasks)
+             for (problem_id, subtasks) in self.tasks.tasks.items()},
+            {'p1': ['s11', 's12'], 'p2': ['s21']})
         self.assertDictEqual(
             self.tasks.subtask_text, {
                 's11': 't 1.1', 's12': 'task 1.2', 's21': 'task 2.1'
@@ -204,6 +287,29 @@ class ModulesTest(unittest.TestCase):
             self.modules.get_content_module('type@video+block@t3'),
             ('module', 3, 'About'))
 
+    def test_index(self):
+        self.modules.add_task('module://chapter/mod/?q', 'block@p1')
+        self.assertIsNone(self.modules.get_task_module('p1'))
+        self.assertDictEqual(self.modules.task_modules, {})
+        self.modules.update_data(FakeCourse(
+            modules={'chapter': 'Module 1'}), FakeAnswers())
+
+        self.assertDictEqual(
+            self.modules.task_modules, {'p1': ('chapter', 1, 'Module 1')})
+        for problem_id in ('p1', 'block@p1', 'block@p1'):
+            self.assertEqual(
+                self.modules.get_task_module(problem_id),
+                ('chapter', 1, 'Module 1'))
+        self.assertIsNone(self.modules.get_task_module('block@p2'))
+        self.assertIsNone(self.modules.get_content_module('p1'))
+        self.assertDictEqual(self.modules.task_modules, {
+            'p1': ('chapter', 1, 'Module 1'),
+            'block@p1': ('chapter', 1, 'Module 1')})
+        self.assertDictEqual(self.modules.content_modules, {})
+
+        with self.assertRaises(IndexError):
+            self.modules.add_task('module', 'p2')
+
 
 class ContentTest(unittest.TestCase):
     def setUp(self):
@@ -218,8 +324,9 @@ class ContentTest(unittest.TestCase):
         self.content.add_content('t2', 'id5')
 
         self.assertDictEqual(
-            self.content.content,
-            {'t1': {'id1', 'id2', 'id4'}, 't2': {'id3', 'id5'}})
+            {content_type: list(content)
+             for (content_type, content) in self.content.content.items()},
+            {'t1': ['id1', 'id2', 'id4'], 't2': ['id3', 'id5']})
 
     def test_add_update(self):
         self.content.add_content('video', 'v1')
@@ -231,8 +338,9 @@ class ContentTest(unittest.TestCase):
         }), FakeAnswers())
 
         self.assertDictEqual(
-            self.content.content,
+            {content_type: list(content)
+             for (content_type, content) in self.content.content.items()},
             {
-                'video': {'v1', 'v2'},
-                'textbook': {'t1'}
+                'video': ['v1', 'v2'],
+                'textbook': ['t1']
             })
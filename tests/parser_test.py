@@ -1,9 +1,10 @@
-import collections
+import gzip
+import os
+import tempfile
 import unittest
 
-from course import CoursesParser
-from .utils import FakeAnswers, FakeCourse
-from logs import LogParser
+from .utils import parse_log
+from reader import LogFiles
 
 
 class LogsTest(unittest.TestCase):
@@ -16,12 +17,17 @@ class LogsTest(unittest.TestCase):
 6:{"event_type": "problem_check", "event_source": "server", "event": {"problem_id": "pp", "submission": {"t1": {"question": "QQ", "response_type": "type", "correct": true}}}, "context": {"user_id": "15"}}
 7:{"event_type": "openassessmentblock.create_submission", "context": {"user_id": "uu", "module": {"usage_key": "block-v1:a+b+type@openassessment+block@bb", "display_name": "aa"}}, "event": {"submission_uuid": "ps1"}, "referer": "https://pages.local/m2/0/"}
 8:{"event_type": "openassessmentblock.peer_assess", "context": {"user_id": "u2"}, "event": {"submission_uuid": "ps1", "parts": [{"option": {"points": 2}, "criterion": {"points_possible": 3}}, {"option": {"points": 1}, "criterion": {"points_possible": 2}}]}}""".strip().split('\n')
+    NOISE = r"""
+{"event_type": "/courses/course-v1:a+b/courseware", "event": "{\"id\": \"v1\"}"}
+{"event_type":"page_close", "event": {"event_type": "play_video"}}
+{"event_type": "play_video", "event": "{\"id\": \"v2\"}", "context": {"user_id": "u3"}}
+{"event_type": "play_\u0076ideo", "event": "{\"id\": \"v2\"}", "context": {"user_id": "u4"}}
+{"event_type": "play_video", "event": "{\"id\": \"v3\"}
+broken""".strip().split('\n')
+    BROKEN = '{"event_type": "problem_check"'
 
     def test_parse(self):
-        report = LogParser(self.LOG, FakeCourse(
-            modules=collections.OrderedDict([
-                ('m1', 'module 1'), ('m2', 'module 2')]),
-            content={}), FakeAnswers([]), CoursesParser(''))
+        report = parse_log(self.LOG)
 
         self.assertSetEqual(
             set(report.get_student_solutions()),
@@ -41,3 +47,197 @@ class LogsTest(unittest.TestCase):
         self.assertSetEqual(
             set(report.get_assessments()),
             {('uu', 'bb', 'u2', 3, 5)})
+
+    def test_parse_parallel(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, 'log')
+            with open(filename, 'w', encoding='utf8') as file:
+                file.write('\n'.join(self.LOG + [self.BROKEN]))
+
+            serial = parse_log(self.LOG + [self.BROKEN])
+            for workers in (2, 3, 8):
+                with self.assertLogs(level='WARNING') as logs:
+                    report = parse_log(
+                        LogFiles(filename, 'utf8'), workers=workers)
+
+                self.assertEqual(
+                    logs.output,
+                    ['WARNING:root:Error on process entry, line 9: '
+                     'list index out of range'])
+                self.assertEqual(report.course_name, serial.course_name)
+                for getter in ('get_student_solutions', 'get_tasks',
+                               'get_student_content', 'get_content',
+                               'get_assessments'):
+                    self.assertListEqual(
+                        sorted(getattr(report, getter)()),
+                        sorted(getattr(serial, getter)()))
+                self.assertListEqual(
+                    list(report.get_student_solutions()),
+                    list(serial.get_student_solutions()))
+
+    def test_pipeline(self):
+        lines = self.LOG + self.NOISE + [
+            '{"event_type": "edx.grades.problem.submitted", "time": '
+            '"2018-01-02T11:00:00", "event": {"problem_id": "p3"}, '
+            '"context": {"user_id": "15", "path": "/c/m1/0/"}}',
+            self.BROKEN]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, 'log')
+            with open(filename, 'w', encoding='utf8') as file:
+                file.write('\n'.join(lines))
+
+            for multi_course in (False, True):
+                with self.assertLogs(level='WARNING') as serial_logs:
+                    serial = parse_log(lines, multi_course=multi_course)
+                with self.assertLogs(level='WARNING') as logs:
+                    report = parse_log(
+                        LogFiles(filename, 'utf8', 64), workers=2,
+                        pipeline=True, multi_course=multi_course)
+
+                self.assertListEqual(logs.output, serial_logs.output)
+                self.assertEqual(
+                    (report.lines, report.lines_decoded, report.lines_skipped),
+                    (serial.lines, serial.lines_decoded, serial.lines_skipped))
+                if multi_course:
+                    self.assertEqual(
+                        report.lines_unassigned, serial.lines_unassigned)
+                    continue
+                self.assertEqual(report.course_name, serial.course_name)
+                for getter in ('get_student_solutions', 'get_tasks',
+                               'get_student_content', 'get_content',
+                               'get_assessments'):
+                    self.assertListEqual(
+                        list(getattr(report, getter)()),
+                        list(getattr(serial, getter)()))
+
+    def test_parse_files(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filenames = []
+            for (i, opener) in enumerate((open, gzip.open, open)):
+                filenames.append(os.path.join(tmpdir, 'log{}'.format(i)))
+                with opener(filenames[-1], 'wt', encoding='utf8') as file:
+                    file.write('\n'.join(self.LOG[i * 3:i * 3 + 3]))
+
+            serial = parse_log(self.LOG)
+            for workers in (1, 2, 4):
+                report = parse_log(
+                    LogFiles(tmpdir, 'utf8', sort=False), workers=workers)
+                self.assertEqual(report.lines, len(self.LOG))
+                self.assertListEqual(
+                    list(report.get_student_solutions()),
+                    list(serial.get_student_solutions()))
+                self.assertSetEqual(
+                    set(report.get_tasks()), set(serial.get_tasks()))
+
+    def test_sparse_content(self):
+        report = parse_log(self.LOG + self.NOISE)
+        self.assertListEqual(
+            list(report.get_student_content(sparse=True)), [('uu', 'v1', 1)])
+        self.assertListEqual(
+            list(report.get_student_content('u3', sparse=True)), [])
+        self.assertListEqual(
+            list(report.get_student_content('u3')), [('u3', 'v1', 0)])
+
+    def test_prefilter(self):
+        with self.assertLogs(level='WARNING') as logs:
+            report = parse_log(self.LOG + self.NOISE)
+
+        self.assertEqual(report.lines, 14)
+        self.assertEqual(report.lines_decoded, 12)
+        self.assertEqual(report.lines_skipped, 2)
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn('line 13', logs.output[0])
+        self.assertSetEqual(
+            set(report.get_student_content()),
+            {('uu', 'v1', 1), ('u3', 'v1', 0), ('u4', 'v1', 0)})
+
+    def test_encodings(self):
+        lines = self.LOG + self.NOISE + [
+            '{"event_type": "play_video", "event": "{\\"id\\": \\"v4\\"}", '
+            '"context": {"user_id": "Студент"}}']
+        serial = parse_log(lines)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for encoding in ('utf8', 'cp1251', 'utf-16', 'utf-16-le'):
+                filename = os.path.join(tmpdir, encoding)
+                with open(filename, 'w', encoding=encoding) as file:
+                    file.write('\n'.join(lines))
+
+                for (workers, pipeline) in ((1, False), (2, False),
+                                            (2, True)):
+                    with self.assertLogs(level='WARNING'):
+                        report = parse_log(
+                            LogFiles(filename, encoding), workers=workers,
+                            pipeline=pipeline)
+                    self.assertEqual(report.lines, serial.lines)
+                    self.assertEqual(
+                        report.lines_skipped, serial.lines_skipped)
+                    self.assertSetEqual(
+                        set(report.get_student_content()),
+                        set(serial.get_student_content()))
+
+    def test_text_file(self):
+        serial = parse_log(self.LOG + self.NOISE)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, 'log')
+            with open(filename, 'w', encoding='utf8') as file:
+                file.write('\n'.join(self.LOG + self.NOISE))
+
+            for (workers, pipeline) in ((1, False), (2, False), (2, True)):
+                with open(filename, encoding='utf8') as file:
+                    with self.assertLogs(level='WARNING'):
+                        report = parse_log(
+                            file, workers=workers, pipeline=pipeline)
+                self.assertEqual(report.lines, serial.lines)
+                self.assertEqual(report.lines_skipped, serial.lines_skipped)
+                self.assertListEqual(
+                    list(report.get_student_content()),
+                    list(serial.get_student_content()))
+
+    def test_multi_course(self):
+        def with_course(lines, course_id):
+            context = '"context": {{"course_id": "course-v1:{}"'.format(
+                course_id)
+            return [
+                line.replace('"context": {', context + ', ')
+                if '"context"' in line else
+                line.replace('{', '{' + context + '}, ', 1)
+                for line in lines]
+
+        first = with_course(self.LOG[:4] + self.LOG[6:], 'a+b+c')
+        second = with_course(self.LOG[:2] + self.LOG[4:6], 'd+e+f')
+        log = [first[0], second[0]] + first[1:4] + second[1:] + first[4:]
+        log.append(self.LOG[0])
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, 'log')
+            with open(filename, 'w', encoding='utf8') as file:
+                file.write('\n'.join(log))
+
+            for (workers, pipeline) in ((1, False), (3, False), (3, True)):
+                report = parse_log(
+                    LogFiles(filename, 'utf8', 128), multi_course=True,
+                    workers=workers, pipeline=pipeline)
+                self.assertEqual(report.lines, len(log))
+                self.assertEqual(report.lines_unassigned, 1)
+                self.assertListEqual(list(report.parsers), ['a+b+c', 'd+e+f'])
+                for (course_id, lines) in (('a+b+c', first),
+                                           ('d+e+f', second)):
+                    (parser, serial) = (
+                        report.parsers[course_id], parse_log(lines))
+                    self.assertEqual(parser.course_name, course_id)
+                    for getter in ('get_student_solutions', 'get_tasks',
+                                   'get_student_content', 'get_content',
+                                   'get_assessments'):
+                        self.assertListEqual(
+                            sorted(getattr(parser, getter)()),
+                            sorted(getattr(serial, getter)()))
+
+    def test_json_decoder(self):
+        serial = parse_log(self.LOG, json_decoder='json')
+        report = parse_log(self.LOG)
+        for getter in ('get_student_solutions', 'get_tasks',
+                       'get_student_content', 'get_content',
+                       'get_assessments'):
+            self.assertListEqual(
+                sorted(getattr(report, getter)()),
+                sorted(getattr(serial, getter)()))
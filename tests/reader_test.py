@@ -0,0 +1,179 @@
+import bz2
+import gzip
+import lzma
+import os
+import tempfile
+import threading
+import unittest
+
+import reader as t
+
+
+class OpenLogTest(unittest.TestCase):
+    LINES = ['{"event_type": "load_video", "id": %d, "name": "Видео"}\n' % i
+             for i in range(2000)]
+
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.tmpdir = self._tmpdir.name
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _write(self, name, opener):
+        filename = os.path.join(self.tmpdir, name)
+        with opener(filename, 'wt', encoding='utf8') as file:
+            file.writelines(self.LINES)
+        return filename
+
+    def test_open(self):
+        for (name, opener, compressed) in (('log', open, False),
+                                           ('log.gz', gzip.open, True),
+                                           ('log.bz2', bz2.open, True),
+                                           ('log.xz', lzma.open, True)):
+            filename = self._write(name, opener)
+            self.assertEqual(t.is_compressed(filename), compressed)
+            for threaded in (True, False):
+                with t.open_log(filename, 'utf8', 1024, threaded) as file:
+                    self.assertListEqual(list(file), self.LINES)
+
+    def test_blocks(self):
+        filename = self._write('log', open)
+        for buffer_size in (2, 100, 1 << 20):
+            for (start, end) in t.split_log(filename, 3):
+                for use_mmap in (True, False):
+                    blocks = list(t.iter_blocks(
+                        filename, start, end, buffer_size, use_mmap=use_mmap))
+                    self.assertTrue(
+                        all(block.endswith(b'\n') for block in blocks))
+                    with open(filename, 'rb') as file:
+                        file.seek(start)
+                        self.assertEqual(
+                            b''.join(blocks), file.read(end - start))
+        self.assertEqual(
+            b''.join(t.iter_blocks(filename, buffer_size=100)).decode(),
+            ''.join(self.LINES))
+
+        empty = os.path.join(self.tmpdir, 'empty')
+        open(empty, 'w').close()
+        self.assertListEqual(list(t.iter_blocks(empty)), [])
+
+    def test_close_early(self):
+        filename = self._write('log.gz', gzip.open)
+        with t.open_log(filename, 'utf8', 16) as file:
+            self.assertEqual(next(file), self.LINES[0])
+
+    def test_error(self):
+        filename = os.path.join(self.tmpdir, 'log.gz')
+        with open(filename, 'wb') as file:
+            file.write(gzip.compress(''.join(self.LINES).encode())[:-100])
+        with t.open_log(filename, 'utf8') as file:
+            with self.assertRaises(EOFError):
+                list(file)
+
+
+class LogFilesTest(unittest.TestCase):
+    DAYS = [
+        ['{"time": "2018-01-03T10:00:00", "n": 5}\n',
+         '{"time": "2018-01-03T11:00:00", "n": 6}\n'],
+        ['garbage\n',
+         '{"time": "2018-01-01T10:00:00", "n": 1}\n',
+         '{"time": "2018-01-01T11:00:00", "n": 2}\n'],
+        ['{"time": "2018-01-02T10:00:00", "n": 3}\n',
+         '{"time": "2018-01-02T11:00:00", "n": 4}'],
+    ]
+
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.tmpdir = self._tmpdir.name
+        os.mkdir(os.path.join(self.tmpdir, 'logs'))
+        self.filenames = []
+        for (i, (lines, opener)) in enumerate(
+                zip(self.DAYS, (open, gzip.open, open))):
+            filename = os.path.join(self.tmpdir, 'logs', 'log{}'.format(i))
+            with opener(filename, 'wt', encoding='utf8') as file:
+                file.writelines(lines)
+            self.filenames.append(filename)
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def test_expand(self):
+        logs = os.path.join(self.tmpdir, 'logs')
+        self.assertListEqual(t.expand_logs([logs]), self.filenames)
+        self.assertListEqual(
+            t.expand_logs([os.path.join(logs, 'log[12]'), self.filenames[2],
+                           self.filenames[0]]),
+            [self.filenames[1], self.filenames[2], self.filenames[0]])
+        self.assertListEqual(t.expand_logs(['missing']), ['missing'])
+
+    def test_order(self):
+        logs = t.LogFiles(os.path.join(self.tmpdir, 'logs'), 'utf8')
+        self.assertListEqual(
+            logs.filenames,
+            [self.filenames[1], self.filenames[2], self.filenames[0]])
+        self.assertListEqual(
+            list(logs), self.DAYS[1] + self.DAYS[2] + self.DAYS[0])
+
+        logs = t.LogFiles(self.filenames, 'utf8', sort=False)
+        self.assertListEqual(logs.filenames, self.filenames)
+
+        with self.assertRaises(FileNotFoundError):
+            t.LogFiles(os.path.join(self.tmpdir, '*.log'), 'utf8')
+
+    def test_shards(self):
+        logs = t.LogFiles(self.filenames, 'utf8', sort=False)
+        for parts in (1, 3, 7):
+            lines = [line.rstrip('\n') for shard in logs.shards(parts)
+                     for line in t.read_lines(*shard)]
+            self.assertListEqual(
+                lines, [line.rstrip('\n') for line in logs])
+        self.assertEqual(
+            len(logs.shards(7)), 5)
+        self.assertIn((self.filenames[1], 'utf8', 0, None), logs.shards(7))
+
+    def test_blocks(self):
+        logs = t.LogFiles(self.filenames, 'utf8', 16, sort=False)
+        blocks = list(logs.iter_blocks())
+        self.assertTrue(all(block.endswith(b'\n') for block in blocks[:-1]))
+        self.assertEqual(
+            b''.join(blocks).decode(), ''.join(sum(self.DAYS, [])))
+        self.assertListEqual(
+            list(t.split_blocks([b'a', b'b\nc', b'd\n', b'e'])),
+            [b'ab\n', b'cd\n', b'e'])
+
+        self.assertTrue(t.is_ascii_compatible('utf8'))
+        self.assertTrue(t.is_ascii_compatible('cp1251'))
+        self.assertFalse(t.is_ascii_compatible('utf-16'))
+        self.assertFalse(t.is_ascii_compatible('missing'))
+
+    @unittest.skipUnless(hasattr(os, 'mkfifo'), 'No named pipes')
+    def test_fifo(self):
+        fifo = os.path.join(self.tmpdir, 'fifo')
+        os.mkfifo(fifo)
+
+        def feed():
+            with open(fifo, 'w', encoding='utf8') as file:
+                file.writelines(self.DAYS[1])
+
+        logs = t.LogFiles([fifo, self.filenames[0]], 'utf8')
+        self.assertListEqual(logs.filenames, [self.filenames[0], fifo])
+        for read in (list, lambda logs: b''.join(
+                logs.iter_blocks()).decode('utf8').splitlines(True)):
+            writer = threading.Thread(target=feed)
+            writer.start()
+            lines = read(logs)
+            writer.join()
+            self.assertListEqual(lines, self.DAYS[0] + self.DAYS[1])
+        self.assertIn((fifo, 'utf8', 0, None), logs.shards(4))
+
+        with self.assertRaises(ValueError):
+            t.LogFiles(fifo, 'utf8', offsets={})
+
+    def test_split(self):
+        size = os.path.getsize(self.filenames[0])
+        self.assertListEqual(t.split_log(self.filenames[0], 1), [(0, size)])
+        self.assertListEqual(
+            t.split_log(self.filenames[0], 2), [(0, 40), (40, size)])
+        self.assertListEqual(
+            t.split_log(self.filenames[0], 200), [(0, 40), (40, size)])
@@ -0,0 +1,81 @@
+import io
+import json
+import os
+import socket
+import tempfile
+import threading
+import unittest
+
+from . import parser_test
+import server as t
+
+
+class ServerTest(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.tmpdir = self._tmpdir.name
+        self.log = os.path.join(self.tmpdir, 'log')
+        with open(self.log, 'w', encoding='utf8') as file:
+            file.write('\n'.join(parser_test.LogsTest.LOG))
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def jobs(self):
+        outputs = []
+        for name in ('a', 'b'):
+            outputs.append(os.path.join(self.tmpdir, name))
+            os.mkdir(outputs[-1])
+        return ([
+            json.dumps({'id': 1, 'args': ['-l', self.log, outputs[0]]}),
+            '',
+            json.dumps({'id': 'b', 'args': [
+                '-l', self.log, '--stats', '-', outputs[1]]}),
+            json.dumps({'id': 3, 'args': ['-l', self.log]}),
+            json.dumps({'id': 4, 'args': ['--help']}),
+            'not json',
+        ], outputs)
+
+    def check(self, responses, outputs):
+        self.assertListEqual(
+            [(response['id'], response['status'])
+             for response in responses],
+            [(1, 'ok'), ('b', 'ok'), (3, 'error'), (4, 'error'),
+             (None, 'error')])
+        self.assertNotIn('stats', responses[0])
+        self.assertEqual(responses[1]['stats']['lines'], 8)
+        self.assertIn('output', responses[2]['error'])
+        self.assertIn('usage:', responses[3]['error'])
+        for output in outputs:
+            with open(os.path.join(output, 'csv1.csv')) as file:
+                self.assertEqual(len(file.readlines()), 3)
+
+    def test_lines(self):
+        (jobs, outputs) = self.jobs()
+        output = io.StringIO()
+        with self.assertLogs(level='ERROR'):
+            t.serve_lines((job + '\n' for job in jobs), output)
+        self.check(
+            list(map(json.loads, output.getvalue().splitlines())), outputs)
+
+    @unittest.skipUnless(hasattr(socket, 'AF_UNIX'), 'No Unix sockets')
+    def test_socket(self):
+        (jobs, outputs) = self.jobs()
+        path = os.path.join(self.tmpdir, 'socket')
+        server = t.socketserver.UnixStreamServer(path, t.JobHandler)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        try:
+            with socket.socket(socket.AF_UNIX) as client:
+                client.connect(path)
+                with client.makefile('rw', encoding='utf8') as file:
+                    with self.assertLogs(level='ERROR'):
+                        file.write(''.join(job + '\n' for job in jobs))
+                        file.flush()
+                        responses = [
+                            json.loads(file.readline()) for _ in range(5)]
+        finally:
+            server.shutdown()
+            server.server_close()
+            thread.join()
+        self.check(responses, outputs)
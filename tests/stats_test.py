@@ -0,0 +1,111 @@
+import json
+import os
+import pickle
+import tempfile
+import unittest
+
+from . import parser_test
+from .utils import parse_log
+from reader import LogFiles
+import stats as t
+
+
+class StatsTest(unittest.TestCase):
+    def test_stages(self):
+        stats = t.Stats()
+        with stats.stage('a'):
+            pass
+        with stats.stage('a'):
+            pass
+        self.assertListEqual(list(stats.iterate('b', [1, 2])), [1, 2])
+        stats.add('c', 1.5)
+
+        self.assertListEqual(list(stats.stages), ['a', 'b', 'c'])
+        self.assertIsNotNone(stats.stages['a'][1])
+        self.assertIsNone(stats.stages['b'][1])
+        self.assertEqual(stats.wall('c'), 1.5)
+        self.assertEqual(stats.wall('missing'), 0.0)
+
+    def test_merge(self):
+        stats = t.Stats()
+        stats.add('a', 1.0, 2.0)
+        stats.handlers['x'] += 1
+        other = pickle.loads(pickle.dumps(stats))
+        other.errors = 2
+        stats.merge(other)
+
+        self.assertListEqual(stats.stages['a'], [1.0, 2.0])
+        self.assertListEqual(stats.workers['a'], [1.0, 2.0])
+        self.assertEqual(stats.handlers['x'], 2)
+        self.assertEqual(stats.errors, 2)
+
+    def test_measure(self):
+        with t.measure(None, 'a'):
+            pass
+        stats = t.Stats()
+        with t.measure(stats, 'a'):
+            pass
+        self.assertIn('a', stats.stages)
+
+
+class ParserStatsTest(unittest.TestCase):
+    LOG = parser_test.LogsTest.LOG + parser_test.LogsTest.NOISE
+
+    def check(self, stats, stages, workers=()):
+        self.assertEqual(stats.lines, 14)
+        self.assertEqual(stats.events, 12)
+        self.assertEqual(stats.skipped, 2)
+        self.assertEqual(stats.errors, 1)
+        self.assertEqual(stats.handlers['play_video'], 3)
+        self.assertEqual(stats.handlers['problem_check'], 2)
+        self.assertEqual(sum(stats.handlers.values()), 11)
+        self.assertListEqual(list(stats.stages), stages)
+        self.assertListEqual(list(stats.workers), list(workers))
+
+        data = json.loads(json.dumps(stats.as_dict()))
+        self.assertEqual(data['events'], 12)
+        self.assertGreater(data['events_per_second'], 0)
+
+    def test_parse(self):
+        stats = t.Stats()
+        with self.assertLogs(level='WARNING'):
+            parse_log(self.LOG, stats=stats)
+        self.check(stats, ['parse.read', 'parse.filter', 'parse.decode',
+                           'parse.dispatch', 'parse', 'update_data'])
+
+    def test_parse_blocks(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, 'log')
+            with open(filename, 'w', encoding='utf8') as file:
+                file.write('\n'.join(self.LOG))
+
+            stats = t.Stats()
+            with self.assertLogs(level='WARNING'):
+                parse_log(LogFiles(filename, 'utf8'), stats=stats)
+            self.check(stats, ['parse.read', 'parse.filter', 'parse.decode',
+                               'parse.dispatch', 'parse', 'update_data'])
+
+    def test_parse_parallel(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, 'log')
+            with open(filename, 'w', encoding='utf8') as file:
+                file.write('\n'.join(self.LOG))
+
+            for multi_course in (False, True):
+                for pipeline in (False, True):
+                    stats = t.Stats()
+                    with self.assertLogs(level='WARNING'):
+                        parse_log(
+                            LogFiles(filename, 'utf8'), workers=3,
+                            stats=stats, multi_course=multi_course,
+                            pipeline=pipeline)
+                    if pipeline:
+                        self.check(
+                            stats, ['parse.read', 'parse.dispatch', 'parse',
+                                    'update_data'],
+                            ['parse.filter', 'parse.decode'])
+                    else:
+                        self.check(
+                            stats, ['parse', 'update_data'],
+                            ['parse.read', 'parse.filter', 'parse.decode',
+                             'parse.dispatch'])
@@ -0,0 +1,89 @@
+import os
+import tempfile
+import unittest
+
+from . import parser_test
+from .utils import parse_log
+from reader import LogFiles
+import store as t
+
+
+class StoreTest(unittest.TestCase):
+    def setUp(self):
+        self.store = t.Store(batch_size=2)
+        self.addCleanup(self.store.close)
+
+    def test_dict(self):
+        data = self.store.dict('data', keys=2)
+        data[('u1', 'p1')] = 't1'
+        data[('u2', 'p1')] = 't2'
+        data[('u3', 'p1')] = 't3'
+        data[('u1', 'p1')] = 't4'
+
+        self.assertEqual(data[('u1', 'p1')], 't4')
+        self.assertEqual(data.get(('u1', 'p2'), 'none'), 'none')
+        self.assertIn(('u3', 'p1'), data)
+        self.assertListEqual(list(data.items()), [
+            (('u1', 'p1'), 't4'), (('u2', 'p1'), 't2'), (('u3', 'p1'), 't3')])
+
+    def test_nonempty_dict(self):
+        data = self.store.dict('data', nonempty=True)
+        data['a'] = ''
+        data['a'] = 'text'
+        data['a'] = ''
+        data['b'] = ''
+        self.assertDictEqual(dict(data.items()), {'a': 'text', 'b': ''})
+
+    def test_groups(self):
+        groups = self.store.groups('groups', unique=True)
+        for (key, value) in [('u1', 'v1'), ('u2', 'v1'), ('u1', 'v2'),
+                             ('u1', 'v1')]:
+            groups[key].add(value)
+
+        self.assertListEqual(list(groups), ['u1', 'u2'])
+        self.assertListEqual(list(groups['u1']), ['v1', 'v2'])
+        self.assertIn('v2', groups['u1'])
+        self.assertNotIn('v2', groups['u2'])
+        self.assertNotIn('u3', groups)
+
+    def test_close(self):
+        self.store.dict('data')['a'] = 'b'
+        self.store.flush()
+        self.assertTrue(os.path.exists(self.store.filename))
+        self.store.close()
+        self.assertFalse(os.path.exists(self.store.filename))
+
+
+class DiskParserTest(unittest.TestCase):
+    LOG = parser_test.LogsTest.LOG + [
+        '{"event_type": "play_video", "event": "{\\"id\\": \\"v1\\"}", '
+        '"context": {"user_id": "u2"}}']
+
+    def assertSameReport(self, report, reference):
+        for name in ('get_student_solutions', 'get_assessments'):
+            self.assertListEqual(
+                list(getattr(report, name)()),
+                list(getattr(reference, name)()))
+        for name in ('get_tasks', 'get_student_content', 'get_content'):
+            self.assertCountEqual(
+                list(getattr(report, name)()),
+                list(getattr(reference, name)()))
+        self.assertDictEqual(
+            report.get_course_info(), reference.get_course_info())
+
+    def test_parse(self):
+        reference = parse_log(self.LOG)
+        with t.Store(batch_size=3) as store:
+            self.assertSameReport(parse_log(self.LOG, store=store), reference)
+
+    def test_parse_parallel(self):
+        reference = parse_log(self.LOG)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, 'log')
+            with open(filename, 'w', encoding='utf8') as file:
+                file.write('\n'.join(self.LOG))
+
+            with t.Store(tmpdir) as store:
+                report = parse_log(
+                    LogFiles(filename, 'utf8'), workers=3, store=store)
+                self.assertSameReport(report, reference)
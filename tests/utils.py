@@ -1,9 +1,29 @@
+import collections
+
+from course import CoursesParser
+from logs import LogParser, MultiCourseParser
+
+
 class FakeCourse:
     def __init__(self, *, modules={}, content=None):
         self.content = content or {}
         self.modules = modules or {}
 
+    def select(self, course_id):
+        return self
+
 
 class FakeAnswers:
     def __init__(self, answers=None):
         self.answers = answers or ()
+
+    def select(self, course_id):
+        return self
+
+
+def parse_log(log, *, multi_course=False, **kwargs):
+    cls = MultiCourseParser if multi_course else LogParser
+    return cls(log, FakeCourse(
+        modules=collections.OrderedDict([
+            ('m1', 'module 1'), ('m2', 'module 2')]),
+        content={}), FakeAnswers([]), CoursesParser(''), **kwargs)
@@ -1,4 +1,5 @@
 import unittest
+from datetime import datetime
 
 import utils as t
 
@@ -41,12 +42,68 @@ class UtilsFunctionsTest(unittest.TestCase):
         self.assertEqual(t.get_items(
             self.DATA, ['aa', 'dd.aa', 'dd.bb.cc.ee.ff']), ['1', '2', '4'])
 
+    def test_compile_item(self):
+        for (item, type_) in (('aa', str), ('aa', int), ('bb', str),
+                              ('cc', list), ('dd.aa', str),
+                              ('dd.bb.cc.dd', str), ('dd.cc', str),
+                              ('dd.cc', int), ('dd.cc', list),
+                              ('xx.yy', dict)):
+            self.assertEqual(
+                t.compile_item(item, type_=type_)(self.DATA),
+                t.get_item(self.DATA, item, type_=type_))
+        self.assertEqual(t.compile_item('aa')(None), '')
+
+        default = t.compile_item('xx', type_=list)
+        default(self.DATA).append(1)
+        self.assertEqual(default(self.DATA), [])
+
+    def test_compile_items(self):
+        self.assertEqual(t.compile_items(['aa'])(self.DATA), ['1'])
+        self.assertEqual(t.compile_items(
+            ['aa', 'bb'], type_=int)(self.DATA), [1, 1])
+        self.assertEqual(t.compile_items(
+            ['aa', 'dd.aa', 'dd.bb.cc.ee.ff'])(self.DATA), ['1', '2', '4'])
+
     def test_convert_datetime(self):
         self.assertEqual(t.convert_datetime('2018-03-03T16:00:14.5678'),
                          '03.03.2018 16:00:14')
         self.assertEqual(t.convert_datetime('2018-03-17T01:59:14.5678+0000'),
                          '17.03.2018 01:59:14')
 
+    def test_convert_datetime_fallback(self):
+        def reference(timestr):
+            return datetime.strptime(
+                timestr.split('.')[0].split('+')[0],
+                '%Y-%m-%dT%H:%M:%S').strftime('%d.%m.%Y %H:%M:%S')
+
+        for timestr in ('2018-01-02T09:30:00', '2018-01-02T09:30:00.000000',
+                        '2018-01-02T09:30:00+00:00', '2018-12-31T23:59:59.9',
+                        '2018-1-2T9:30:00', '2018-01-02T09:30:00.1+00:00',
+                        '2016-02-29T00:00:00', '2018-01-02T09:30:00+0.5'):
+            self.assertEqual(t.convert_datetime(timestr), reference(timestr))
+
+        for timestr in ('2018-02-30T09:30:00', '2018-13-01T09:30:00',
+                        '2018-01-02T24:00:00', '2018-01-02T09:30:00Z',
+                        '2018-01-02 09:30:00', '2018-01-02T09:30:00-05:00',
+                        '', 'None'):
+            with self.assertRaises(ValueError):
+                reference(timestr)
+            with self.assertRaises(ValueError):
+                t.convert_datetime(timestr)
+
+    def test_timestamp(self):
+        for timestr in ('01.01.1970 00:00:00', '03.03.2018 16:00:14',
+                        '29.02.2016 23:59:59', '31.12.1969 12:00:00'):
+            timestamp = t.to_timestamp(timestr)
+            self.assertIsInstance(timestamp, int)
+            self.assertEqual(t.format_timestamp(timestamp), timestr)
+        self.assertEqual(t.to_timestamp('02.01.1970 00:00:01'), 86401)
+
+        for timestr in ('30.02.2018 00:00:00', '2018-01-02T09:30:00',
+                        '1.01.2018 00:00:00', '01.01.2018 00:00:00 ', '',
+                        None, 't1'):
+            self.assertIsNone(t.to_timestamp(timestr))
+
 
 class NonEmptyDictTests(unittest.TestCase):
     def test_dict(self):
@@ -69,6 +126,19 @@ class NonEmptyDictTests(unittest.TestCase):
         self.assertDictEqual(d, {'q': 10, 'x': 20})
 
 
+class InternerTests(unittest.TestCase):
+    def test_interner(self):
+        ids = t.Interner()
+        self.assertEqual(ids('a'), 0)
+        self.assertEqual(ids('b'), 1)
+        self.assertEqual(ids('a'), 0)
+        self.assertEqual(ids.get('b'), 1)
+        self.assertIsNone(ids.get('c'))
+        self.assertEqual(ids[1], 'b')
+        self.assertEqual(len(ids), 2)
+        self.assertListEqual(list(ids), ['a', 'b'])
+
+
 class RegistryTests(unittest.TestCase):
     registry = t.Registry()
 
@@ -92,3 +162,31 @@ class RegistryTests(unittest.TestCase):
         self.assertEqual(self.registry(self, {'x': 'c', 'y': 'b'}), 3)
         self.assertEqual(self.registry(self, {'x': 'd', 'y': 'a'}), None)
         self.assertEqual(self.registry(self, {'x': 'd', 'y': 'b'}), 3)
+
+    def test_values(self):
+        self.assertEqual(self.registry.values('x'), {'a', 'b', 'c', 'd'})
+        self.assertIsNone(self.registry.values('y'))
+
+        registry = t.Registry()
+        registry.add(x='a')(lambda obj, item: None)
+        self.assertEqual(registry.values('x'), {'a'})
+        registry.add()(lambda obj, item: None)
+        self.assertIsNone(registry.values('x'))
+
+    def test_dispatch(self):
+        registry = t.Registry()
+        registry.add(x='a', y='b')(lambda obj, item: 1)
+        registry.add(x=['a', 'b'])(lambda obj, item: 2)
+        registry.add(x='a')(lambda obj, item: 3)
+
+        self.assertEqual(registry(self, {'x': 'a', 'y': 'b'}), 1)
+        self.assertEqual(registry(self, {'x': 'a'}), 2)
+        self.assertEqual(registry(self, {'x': 'b', 'y': 'b'}), 2)
+        self.assertEqual(registry(self, {'x': ['a']}), None)
+        self.assertEqual(registry(self, {'y': 'b'}), None)
+
+        registry.add(y='c')(lambda obj, item: 4)
+        registry.add()(lambda obj, item: 5)
+        self.assertEqual(registry(self, {'x': 'a'}), 2)
+        self.assertEqual(registry(self, {'y': 'c'}), 4)
+        self.assertEqual(registry(self, {'x': {}}), 5)
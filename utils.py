@@ -1,11 +1,26 @@
 import collections
-from datetime import datetime
+import functools
+import re
+from datetime import datetime, timedelta
+
+
+ISO_DATETIME = re.compile(
+    r'[1-9][0-9]{3}-[0-9]{2}-[0-9]{2}T[0-9]{2}:[0-9]{2}:[0-9]{2}(?:[.+]|$)')
+DATETIME = re.compile(
+    r'([0-9]{2})\.([0-9]{2})\.([0-9]{4}) ([0-9]{2}):([0-9]{2}):([0-9]{2})$')
+EPOCH = datetime(1970, 1, 1)
+BLOCK_ID = re.compile(r'block-v1:(.+?)\+type@')
 
 
 def get_id(edx_id):
     return edx_id.split('@')[-1]
 
 
+def get_course_key(block_id):
+    match = BLOCK_ID.search(block_id)
+    return match.group(1) if match else None
+
+
 def get_item(data, item, *, type_=str):
     if '.' in item:
         (name, rest) = item.split('.', maxsplit=1)
@@ -18,12 +33,67 @@ def get_items(data, items, *, type_=str):
     return list(map(lambda item: get_item(data, item, type_=type_), items))
 
 
+def compile_item(item, *, type_=str):
+    (*parents, name) = item.split('.')
+    default = type_()
+
+    if not parents:
+        def getter(data):
+            return type_((data or {}).get(name, default))
+    else:
+        def getter(data):
+            for parent in parents:
+                data = (data or {}).get(parent, {})
+            return type_((data or {}).get(name, default))
+    return getter
+
+
+def compile_items(items, *, type_=str):
+    getters = tuple(compile_item(item, type_=type_) for item in items)
+
+    def getter(data):
+        return [get(data) for get in getters]
+    return getter
+
+
 def convert_datetime(timestr):
+    if ISO_DATETIME.match(timestr):
+        return _convert_iso_datetime(timestr[:19])
     return datetime.strptime(
         timestr.split('.')[0].split('+')[0],
         '%Y-%m-%dT%H:%M:%S').strftime('%d.%m.%Y %H:%M:%S')
 
 
+@functools.lru_cache(maxsize=65536)
+def _convert_iso_datetime(timestr):
+    datetime(*map(int, (timestr[0:4], timestr[5:7], timestr[8:10],
+                        timestr[11:13], timestr[14:16], timestr[17:19])))
+    return '{}.{}.{} {}'.format(
+        timestr[8:10], timestr[5:7], timestr[0:4], timestr[11:19])
+
+
+def to_timestamp(timestr):
+    if isinstance(timestr, str) and DATETIME.match(timestr):
+        return _to_timestamp(timestr)
+    return None
+
+
+@functools.lru_cache(maxsize=65536)
+def _to_timestamp(timestr):
+    (day, month, year, *rest) = map(int, DATETIME.match(timestr).groups())
+    try:
+        delta = datetime(year, month, day, *rest) - EPOCH
+    except ValueError:
+        return None
+    return delta.days * 86400 + delta.seconds
+
+
+@functools.lru_cache(maxsize=65536)
+def format_timestamp(timestamp):
+    return '{0.day:02}.{0.month:02}.{0.year:04} {0:%H:%M:%S}'.format(
+        EPOCH + timedelta(seconds=timestamp))
+
+
 def iscollection(type_):
     return isinstance(type_, (tuple, list, set, frozenset))
 
@@ -42,12 +112,42 @@ class NonEmptyOrderedDict(NonEmptyMixin, collections.OrderedDict):
     pass
 
 
+class Interner:
+    def __init__(self):
+        self.codes = {}
+        self.names = []
+
+    def __call__(self, name):
+        code = self.codes.get(name)
+        if code is None:
+            code = self.codes[name] = len(self.names)
+            self.names.append(name)
+        return code
+
+    def get(self, name):
+        return self.codes.get(name)
+
+    def __getitem__(self, code):
+        return self.names[code]
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+
 class Registry:
     _NULL = object()
 
     def __init__(self):
         self.handlers = []
-        self.default = lambda obj, item: None
+        self.default = Registry._ignore
+        self._compiled = False
+
+    @staticmethod
+    def _ignore(obj, item):
+        return None
 
     def add(self, **kwargs):
         def wrapper(func):
@@ -58,9 +158,20 @@ class Registry:
                 }, func))
             else:
                 self.default = func
+            self._compiled = False
             return func
         return wrapper
 
+    def values(self, key):
+        if self.default is not Registry._ignore:
+            return None
+        values = set()
+        for (kwargs, _) in self.handlers:
+            if key not in kwargs:
+                return None
+            values.update(kwargs[key])
+        return frozenset(values)
+
     @staticmethod
     def check_item(item, kwargs):
         for (key, values) in kwargs.items():
@@ -68,8 +179,40 @@ class Registry:
                 return False
         return True
 
+    def _compile(self):
+        self._key = None
+        self._index = {}
+        self._compiled = True
+
+        keys = [set(kwargs) for (kwargs, _) in self.handlers]
+        if not keys:
+            return
+        try:
+            key = max(sorted(set.intersection(*keys)), key=lambda key: len({
+                value for (kwargs, _) in self.handlers
+                for value in kwargs[key]}))
+            for (kwargs, func) in self.handlers:
+                rest = {name: values for (name, values) in kwargs.items()
+                        if name != key}
+                for value in set(kwargs[key]):
+                    self._index.setdefault(value, []).append((rest, func))
+        except (ValueError, TypeError):
+            self._index = {}
+            return
+        self._key = key
+
     def __call__(self, obj, item):
-        for (kwargs, func) in self.handlers:
+        if not self._compiled:
+            self._compile()
+        if self._key is None:
+            handlers = self.handlers
+        else:
+            try:
+                handlers = self._index.get(
+                    item.get(self._key, Registry._NULL), ())
+            except TypeError:
+                handlers = ()
+        for (kwargs, func) in handlers:
             if Registry.check_item(item, kwargs):
                 return func(obj, item)
         return self.default(obj, item)